@@ -0,0 +1,33 @@
+"""Add short_code_blocks table
+
+Revision ID: 3b7c1e9a52d4
+Revises: 9a048e2556b1
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7c1e9a52d4'
+down_revision: Union[str, Sequence[str], None] = '9a048e2556b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    short_code_blocks = op.create_table('short_code_blocks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('next_value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(short_code_blocks, [{'name': 'short_code', 'next_value': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('short_code_blocks')
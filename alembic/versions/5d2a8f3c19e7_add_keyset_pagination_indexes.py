@@ -0,0 +1,30 @@
+"""Add keyset pagination indexes
+
+Revision ID: 5d2a8f3c19e7
+Revises: c81f4d2e6a90
+Create Date: 2026-10-18 12:14:51.208337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f3c19e7'
+down_revision: Union[str, Sequence[str], None] = 'c81f4d2e6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_urls_user_id_created_at_id', 'urls', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_urls_user_id_created_at_id', table_name='urls')
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,33 @@
+"""Add visitor_sketches table
+
+Revision ID: 7f3e2b6d9c14
+Revises: e4b9c7a1d305
+Create Date: 2026-10-18 13:48:03.915520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3e2b6d9c14'
+down_revision: Union[str, Sequence[str], None] = 'e4b9c7a1d305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('visitor_sketches',
+    sa.Column('short_code', sa.String(length=10), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('registers', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('short_code', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('visitor_sketches')
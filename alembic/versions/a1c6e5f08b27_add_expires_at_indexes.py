@@ -0,0 +1,33 @@
+"""Add expires_at indexes for the maintenance worker
+
+Revision ID: a1c6e5f08b27
+Revises: 7f3e2b6d9c14
+Create Date: 2026-10-18 14:20:37.502164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c6e5f08b27'
+down_revision: Union[str, Sequence[str], None] = '7f3e2b6d9c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_urls_active_expires_at', 'urls', ['expires_at'], unique=False,
+        postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active = 1')
+    )
+    op.create_index('ix_blacklistedtokens_expires_at', 'blacklistedtokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blacklistedtokens_expires_at', table_name='blacklistedtokens')
+    op.drop_index('ix_urls_active_expires_at', table_name='urls')
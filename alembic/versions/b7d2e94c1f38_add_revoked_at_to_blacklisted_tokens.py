@@ -0,0 +1,34 @@
+"""Add revoked_at to blacklisted tokens
+
+Revision ID: b7d2e94c1f38
+Revises: a1c6e5f08b27
+Create Date: 2026-10-18 16:05:12.318407
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e94c1f38'
+down_revision: Union[str, Sequence[str], None] = 'a1c6e5f08b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # already revoked tokens are stamped with the migration time
+    op.add_column(
+        'blacklistedtokens',
+        sa.Column('revoked_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP'))
+    )
+    op.create_index('ix_blacklistedtokens_revoked_at', 'blacklistedtokens', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blacklistedtokens_revoked_at', table_name='blacklistedtokens')
+    op.drop_column('blacklistedtokens', 'revoked_at')
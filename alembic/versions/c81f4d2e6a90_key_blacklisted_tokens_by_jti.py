@@ -0,0 +1,52 @@
+"""Key blacklisted tokens by jti
+
+Revision ID: c81f4d2e6a90
+Revises: 3b7c1e9a52d4
+Create Date: 2026-10-18 11:02:17.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import jwt
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4d2e6a90'
+down_revision: Union[str, Sequence[str], None] = '3b7c1e9a52d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blacklistedtokens', sa.Column('jti', sa.String(length=36), nullable=True))
+
+    # backfill the jti of already revoked tokens (they were verified when they were blacklisted)
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, token FROM blacklistedtokens")).fetchall()
+    for row_id, token in rows:
+        try:
+            jti = jwt.decode(token, options={"verify_signature": False}).get("jti")
+        except jwt.PyJWTError:
+            jti = None
+
+        if jti:
+            conn.execute(sa.text("UPDATE blacklistedtokens SET jti = :jti WHERE id = :id"), {"jti": jti, "id": row_id})
+        else:
+            conn.execute(sa.text("DELETE FROM blacklistedtokens WHERE id = :id"), {"id": row_id})
+
+    op.drop_index(op.f('ix_blacklistedtokens_token'), table_name='blacklistedtokens')
+    op.drop_column('blacklistedtokens', 'token')
+    op.create_index(op.f('ix_blacklistedtokens_jti'), 'blacklistedtokens', ['jti'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the full token strings are gone, so previously revoked tokens can't be restored
+    op.drop_index(op.f('ix_blacklistedtokens_jti'), table_name='blacklistedtokens')
+    op.execute("DELETE FROM blacklistedtokens")
+    op.add_column('blacklistedtokens', sa.Column('token', sa.String(), nullable=True))
+    op.create_index(op.f('ix_blacklistedtokens_token'), 'blacklistedtokens', ['token'], unique=True)
+    op.drop_column('blacklistedtokens', 'jti')
@@ -0,0 +1,46 @@
+"""Add click_events and click_rollups tables
+
+Revision ID: e4b9c7a1d305
+Revises: 5d2a8f3c19e7
+Create Date: 2026-10-18 13:05:22.471906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c7a1d305'
+down_revision: Union[str, Sequence[str], None] = '5d2a8f3c19e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('click_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('short_code', sa.String(length=10), nullable=False),
+    sa.Column('clicked_at', sa.DateTime(), nullable=False),
+    sa.Column('referrer', sa.String(length=255), nullable=True),
+    sa.Column('user_agent_family', sa.String(length=20), nullable=False),
+    sa.Column('country', sa.String(length=2), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_click_events_short_code_clicked_at', 'click_events', ['short_code', 'clicked_at'], unique=False)
+    op.create_table('click_rollups',
+    sa.Column('short_code', sa.String(length=10), nullable=False),
+    sa.Column('granularity', sa.String(length=6), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('short_code', 'granularity', 'bucket_start')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('click_rollups')
+    op.drop_index('ix_click_events_short_code_clicked_at', table_name='click_events')
+    op.drop_table('click_events')
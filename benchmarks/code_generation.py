@@ -0,0 +1,95 @@
+"""
+URL creation throughput per short code strategy at a given number of existing rows.
+
+- legacy:   random code + SELECT probe per attempt, then INSERT (the old generate_short_code)
+- random:   random code, INSERT and retry on unique violation
+- sequence: block-allocated counter codes, INSERT and retry on unique violation
+
+    python -m benchmarks.code_generation --existing 1000000 10000000 --create 2000
+"""
+import argparse
+import asyncio
+import json
+import secrets
+import sys
+import time
+
+from benchmarks.common import reset_schema, seed_user, seed_urls
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from src.app.db.main import async_engine
+from src.app.models import URL
+from src.app.schemas import URLCreate
+from src.app.services import url_services
+from src.app.core import utils
+from src.app.core.codegen import RandomCodeGenerator, SequenceCodeGenerator, ALPHABET
+
+
+class Owner:
+    def __init__(self, id):
+        self.id = id
+
+
+async def legacy_create(url_data: URLCreate, owner: Owner, session: AsyncSession):
+    while True:
+        code = ''.join(secrets.choice(ALPHABET) for _ in range(8))
+        result = await session.execute(select(URL).where(URL.short_code == code))
+        if not result.scalar_one_or_none():
+            break
+
+    new_url = URL(original_url=str(url_data.original_url), short_code=code, user_id=owner.id)
+    session.add(new_url)
+    await session.commit()
+    await session.refresh(new_url)
+
+
+async def run_strategy(name: str, owner: Owner, count: int) -> dict:
+    generators = {
+        "random": RandomCodeGenerator(length=8),
+        "sequence": SequenceCodeGenerator(length=8, block_size=1000, scramble=True)
+    }
+    if name in generators:
+        utils.get_code_generator = lambda: generators[name]
+
+    url_data = URLCreate(original_url="https://example.com/landing")
+
+    started = time.perf_counter()
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        for _ in range(count):
+            if name == "legacy":
+                await legacy_create(url_data, owner, session)
+            else:
+                await url_services.create_short_url(url_data, owner, session)
+    elapsed = time.perf_counter() - started
+
+    return {"strategy": name, "created": count, "seconds": round(elapsed, 3), "per_second": round(count / elapsed, 1)}
+
+
+async def main(existing_counts: list[int], create: int) -> None:
+    results = []
+
+    try:
+        for existing in existing_counts:
+            await reset_schema(async_engine)
+            user_id = await seed_user(async_engine, "bench")
+            await seed_urls(async_engine, user_id, existing, prefix="s")
+
+            for name in ("legacy", "random", "sequence"):
+                result = await run_strategy(name, Owner(user_id), create)
+                result["existing_rows"] = existing
+                results.append(result)
+                print(json.dumps(result), file=sys.stderr)
+    finally:
+        await async_engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--existing", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--create", type=int, default=2000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.existing, args.create))
@@ -0,0 +1,83 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Importing this module points the app at a throwaway SQLite database (unless DATABASE_URL
+is already set), so it must be imported before anything under `src`.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+
+BENCH_DIR = tempfile.mkdtemp(prefix="url_shortner_bench_")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(BENCH_DIR, 'bench.db')}")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+
+
+from sqlmodel import SQLModel  # noqa: E402
+from src.app.models import User, URL  # noqa: E402
+
+
+SEED_CHUNK = 5000
+
+
+async def reset_schema(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+async def seed_user(engine, username: str, hashed_password: str = "not-a-real-hash") -> int:
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            User.__table__.insert().returning(User.__table__.c.id),
+            {
+                "first_name": username,
+                "last_name": username,
+                "username": username,
+                "email_address": f"{username}@bench.local",
+                "hashed_password": hashed_password,
+                "created_at": datetime.now()
+            }
+        )
+        return result.scalar_one()
+
+
+async def seed_urls(engine, user_id: int, count: int, prefix: str = "b") -> list[str]:
+    """
+    Inserts `count` URLs owned by `user_id` in chunks and returns their short codes.
+    """
+
+    codes = []
+    now = datetime.now()
+
+    for start in range(0, count, SEED_CHUNK):
+        rows = []
+        for i in range(start, min(start + SEED_CHUNK, count)):
+            code = f"{prefix}{i:x}"
+            codes.append(code)
+            rows.append({
+                "original_url": f"https://example.com/{prefix}/{i}",
+                "short_code": code,
+                "user_id": user_id,
+                "created_at": now - timedelta(seconds=i),
+                "expires_at": now + timedelta(days=2),
+                "click_count": 0,
+                "is_active": True
+            })
+
+        async with engine.begin() as conn:
+            await conn.execute(URL.__table__.insert(), rows)
+
+    return codes
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,89 @@
+"""
+Regression benchmark: memory used by the streaming link export vs. rows exported.
+
+Drives `export_chunks` (the body of `GET /urls/me/export`) over a user with `--rows`
+links and samples tracemalloc along the way. Exits non-zero if peak memory at the end
+of the export is meaningfully higher than after the first tenth of it.
+
+    python -m benchmarks.export_memory --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import reset_schema, seed_user, seed_urls
+
+from src.app.db.main import async_engine
+from src.app.api.shortner import export_chunks
+
+
+#slack for allocator noise on top of the early peak
+TOLERANCE_BYTES = 1024 * 1024
+
+
+async def measure(user_id: int, rows: int, export_format: str) -> dict:
+    checkpoints = {rows // 10, rows // 2, rows}
+    samples = []
+    exported = 0
+    body_bytes = 0
+
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    try:
+        async for chunk in export_chunks(user_id, export_format):
+            body_bytes += len(chunk)
+            exported += chunk.count("\n")
+
+            #the csv header line is not a row
+            done = exported - (1 if export_format == "csv" else 0)
+            for checkpoint in sorted(checkpoints):
+                if done >= checkpoint:
+                    checkpoints.discard(checkpoint)
+                    current, peak = tracemalloc.get_traced_memory()
+                    samples.append({"rows": done, "current_kb": current // 1024, "peak_kb": peak // 1024})
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "format": export_format,
+        "seconds": round(time.perf_counter() - started, 2),
+        "body_mb": round(body_bytes / 1024 / 1024, 1),
+        "samples": samples
+    }
+
+
+async def main(rows: int) -> int:
+    results = []
+
+    try:
+        await reset_schema(async_engine)
+
+        user_id = await seed_user(async_engine, "exporter")
+        await seed_urls(async_engine, user_id, rows, prefix="e")
+
+        for export_format in ("ndjson", "csv"):
+            results.append(await measure(user_id, rows, export_format))
+    finally:
+        await async_engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+    for result in results:
+        first, last = result["samples"][0], result["samples"][-1]
+        if last["peak_kb"] * 1024 > first["peak_kb"] * 1024 * 1.5 + TOLERANCE_BYTES:
+            print(f"REGRESSION: {result['format']} export memory grows with the number of rows", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.rows)))
@@ -0,0 +1,83 @@
+"""
+Benchmark: cost per click of the unique-visitor sketch update, and its accuracy.
+
+Times `VisitorCounter.record()` (what a redirect pays) and a plain `HyperLogLog.add()`,
+then compares estimates with the true count at a few cardinalities. No database needed.
+
+    python -m benchmarks.hll_update --clicks 200000
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.common import percentile
+
+from src.app.core.hll import HyperLogLog
+from src.app.core.visitors import VisitorCounter
+
+
+def time_per_call(fn, values: list[str], codes: list[str]) -> dict:
+    samples = []
+
+    started = time.perf_counter()
+    for value, code in zip(values, codes):
+        t0 = time.perf_counter_ns()
+        fn(code, value)
+        samples.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "calls": len(values),
+        "mean_ns": round(elapsed / len(values) * 1e9),
+        "p50_ns": percentile(samples, 50),
+        "p99_ns": percentile(samples, 99)
+    }
+
+
+def main(clicks: int, precision: int) -> int:
+    values = [f"10.{i % 256}.{i // 256 % 256}.{i // 65536 % 256}|Mozilla/5.0" for i in range(clicks)]
+    codes = [f"c{i % 1000}" for i in range(clicks)]
+
+    counter = VisitorCounter(precision=precision, flush_interval=60)
+    sketch = HyperLogLog(precision)
+
+    results = {
+        "record": time_per_call(counter.record, values, codes),
+        "hll_add": time_per_call(lambda code, value: sketch.add(value), values, codes),
+        "pending_sketches": len(counter._pending),
+        "accuracy": []
+    }
+
+    for cardinality in (100, 10000, 100000, 1000000):
+        sketch = HyperLogLog(precision)
+        for i in range(cardinality):
+            sketch.add(f"visitor-{i}")
+
+        estimate = sketch.count()
+        results["accuracy"].append({
+            "true": cardinality,
+            "estimate": estimate,
+            "error_pct": round((estimate - cardinality) / cardinality * 100, 3),
+            "standard_error_pct": round(sketch.standard_error * 100, 3),
+            "sketch_bytes": len(sketch.to_bytes())
+        })
+
+    print(json.dumps(results, indent=2))
+
+    #outside three standard errors is practically impossible for a working sketch
+    for row in results["accuracy"]:
+        if abs(row["error_pct"]) > 3 * row["standard_error_pct"]:
+            print(f"REGRESSION: estimate for {row['true']} visitors is off by {row['error_pct']}%", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clicks", type=int, default=200000)
+    parser.add_argument("--precision", type=int, default=12)
+    args = parser.parse_args()
+
+    sys.exit(main(args.clicks, args.precision))
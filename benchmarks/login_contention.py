@@ -0,0 +1,109 @@
+"""
+Redirect latency while logins are hammered, with bcrypt on the worker pool vs. inline.
+
+"inline" reproduces the old behaviour (bcrypt called directly on the event loop) by
+swapping the login route's verify_password for a synchronous call.
+
+    python -m benchmarks.login_contention --seconds 5 --redirect-concurrency 20 --login-concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import percentile
+
+import httpx
+from src import app
+from src.app.api import auth as auth_module
+from src.app.core.hashing import bcrypt_verify
+from src.app.db.main import async_engine
+
+
+USER = {
+    "first_name": "bench",
+    "last_name": "bench",
+    "username": "bench",
+    "email_address": "bench@bench.local",
+    "hashed_password": "Bench@2024"
+}
+
+
+async def inline_verify_password(password: str, hashed_password: str) -> bool:
+    return bcrypt_verify(password, hashed_password)
+
+
+async def redirect_worker(client, short_code: str, deadline: float, samples: list):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get(f"/api/v1/urls/{short_code}")
+        samples.append((time.perf_counter() - started) * 1000)
+        #a warm redirect over ASGITransport never suspends, so yield or the login workers never run
+        await asyncio.sleep(0)
+
+
+async def login_worker(client, deadline: float, counter: list):
+    payload = {"username": USER["email_address"], "password": USER["hashed_password"]}
+    while time.perf_counter() < deadline:
+        response = await client.post("/api/v1/auth/login", json=payload)
+        if response.status_code == 200:
+            counter[0] += 1
+
+
+async def run_phase(client, short_code: str, seconds: float, redirects: int, logins: int) -> dict:
+    deadline = time.perf_counter() + seconds
+    samples: list = []
+    login_count = [0]
+
+    await asyncio.gather(
+        *(redirect_worker(client, short_code, deadline, samples) for _ in range(redirects)),
+        *(login_worker(client, deadline, login_count) for _ in range(logins))
+    )
+
+    return {
+        "redirects": len(samples),
+        "redirect_p50_ms": round(percentile(samples, 50), 2),
+        "redirect_p99_ms": round(percentile(samples, 99), 2),
+        "logins": login_count[0]
+    }
+
+
+async def main(seconds: float, redirects: int, logins: int) -> None:
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/api/v1/auth/signup", json=USER)
+            login = await client.post("/api/v1/auth/login", json={"username": USER["email_address"], "password": USER["hashed_password"]})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            created = await client.post("/api/v1/urls", json={"original_url": "https://example.com/"}, headers=headers)
+            short_code = created.json()["short_code"]
+
+            results["redirects_only"] = await run_phase(client, short_code, seconds, redirects, 0)
+            results["logins_on_pool"] = await run_phase(client, short_code, seconds, redirects, logins)
+
+            pooled_verify = auth_module.verify_password
+            auth_module.verify_password = inline_verify_password
+            try:
+                results["logins_inline"] = await run_phase(client, short_code, seconds, redirects, logins)
+            finally:
+                auth_module.verify_password = pooled_verify
+
+    #otherwise the redirect latencies were measured without any login contention
+    for phase in ("logins_on_pool", "logins_inline"):
+        assert results[phase]["logins"] > 0, f"no login completed during {phase}"
+
+    await async_engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--redirect-concurrency", type=int, default=20)
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.seconds, args.redirect_concurrency, args.login_concurrency))
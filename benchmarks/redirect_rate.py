@@ -0,0 +1,108 @@
+"""
+Benchmark: redirects per second through the versioned API route vs. the lean top-level one.
+
+Requests are driven straight through the ASGI app (no HTTP client, no sockets), so the
+numbers are the framework + handler cost per redirect, with the redirect cache warm
+(warmed by one pass over every link before timing).
+
+    python -m benchmarks.redirect_rate --requests 20000 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import reset_schema, seed_user, seed_urls
+
+from src import app
+from src.app.db.main import async_engine
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench/1.0")],
+        "client": ("127.0.0.1", 40000),
+        "server": ("bench", 80)
+    }
+
+
+async def request(path: str) -> int:
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(make_scope(path), receive, send)
+    return status
+
+
+async def run(paths: list[str], total: int, concurrency: int) -> dict:
+    statuses = {}
+
+    async def worker(offset: int):
+        for i in range(offset, total, concurrency):
+            status = await request(paths[i % len(paths)])
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "requests_per_second": round(total / elapsed),
+        "us_per_request": round(elapsed / total * 1e6, 1),
+        "statuses": statuses
+    }
+
+
+async def main(total: int, concurrency: int, links: int) -> None:
+    results = {}
+
+    try:
+        await reset_schema(async_engine)
+        user_id = await seed_user(async_engine, "redirector")
+        codes = await seed_urls(async_engine, user_id, links, prefix="q")
+
+        routes = {
+            "api_v1": [f"/api/v1/urls/{code}" for code in codes],
+            "top_level": [f"/{code}" for code in codes]
+        }
+
+        #no lifespan: the background click writers would compete for SQLite's write lock;
+        #clicks just stay buffered for the length of the run
+        for paths in routes.values():
+            await run(paths, len(paths), 1)
+
+        for name, paths in routes.items():
+            results[name] = await run(paths, total, concurrency)
+    finally:
+        await async_engine.dispose()
+
+    results["speedup"] = round(results["top_level"]["requests_per_second"] / results["api_v1"]["requests_per_second"], 2)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--links", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency, args.links))
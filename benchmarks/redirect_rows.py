@@ -0,0 +1,106 @@
+"""
+Regression benchmark: rows fetched per redirect lookup vs. the owner's link count.
+
+Compares the lean `URLService.lookup_short_code` path with the old behaviour
+(`select(URL)` with the owner and all of the owner's URLs eager-loaded) and exits
+non-zero if the lean path stops being constant.
+
+    python -m benchmarks.redirect_rows --links 1 100 10000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.common import reset_schema, seed_user, seed_urls
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from src.app.db.main import async_engine
+from src.app.models import User, URL
+from src.app.services import url_services
+
+
+class RowCounter:
+    """
+    Counts statements issued and rows materialised (ORM instances + plain rows).
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    def on_execute(self, *args):
+        self.statements += 1
+
+    def on_load(self, target, context):
+        self.rows += 1
+
+
+async def legacy_lookup(code: str, session: AsyncSession):
+    statement = (
+        select(URL)
+        .where(URL.short_code == code)
+        .options(selectinload(URL.user).selectinload(User.url))
+    )
+    result = await session.execute(statement)
+    return result.scalar_one_or_none()
+
+
+async def measure(lookup, code: str) -> dict:
+    counter = RowCounter()
+    sync_engine = async_engine.sync_engine
+
+    event.listen(sync_engine, "before_cursor_execute", counter.on_execute)
+    event.listen(URL, "load", counter.on_load)
+    event.listen(User, "load", counter.on_load)
+
+    try:
+        async with AsyncSession(async_engine) as session:
+            result = await lookup(code, session)
+            if result is not None and not isinstance(result, (URL, User)):
+                counter.rows += 1
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", counter.on_execute)
+        event.remove(URL, "load", counter.on_load)
+        event.remove(User, "load", counter.on_load)
+
+    return {"statements": counter.statements, "rows": counter.rows}
+
+
+async def main(link_counts: list[int]) -> int:
+    results = []
+
+    try:
+        await reset_schema(async_engine)
+
+        for index, links in enumerate(link_counts):
+            user_id = await seed_user(async_engine, f"owner{index}")
+            codes = await seed_urls(async_engine, user_id, links, prefix=f"r{index}_")
+
+            results.append({
+                "owner_links": links,
+                "lean": await measure(url_services.lookup_short_code, codes[0]),
+                "legacy": await measure(legacy_lookup, codes[0])
+            })
+    finally:
+        await async_engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+    lean_rows = {r["lean"]["rows"] for r in results}
+    if len(lean_rows) != 1:
+        print("REGRESSION: rows fetched per redirect depends on owner link count", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, nargs="+", default=[1, 100, 10000])
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.links)))
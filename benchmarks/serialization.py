@@ -0,0 +1,92 @@
+"""
+Benchmark: per-row cost of a URL listing, before and after the fast path.
+
+- before: ORM `URL` entities -> `response_model=List[URLRead]` validation/serialization
+  (FastAPI's `serialize_response`) -> `JSONResponse`
+- after: plain rows of the `URLRead` columns -> dicts -> `ORJSONResponse`, no re-validation
+
+Both the fetch (from a seeded SQLite table) and the encoding are timed, in microseconds per row.
+
+    python -m benchmarks.serialization --rows 100 --repeat 200
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import reset_schema, seed_user, seed_urls
+
+from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlmodel import select
+from src.app.models import URL
+from src.app.schemas import URLRead
+from src.app.services import URL_READ_COLUMNS
+from src.app.db.main import async_engine, async_session_maker
+
+
+RESPONSE_FIELD = create_model_field("Response_get_urls", List[URLRead], mode="serialization")
+
+
+async def fetch_entities(session, limit: int):
+    return (await session.execute(select(URL).limit(limit))).scalars().all()
+
+
+async def fetch_rows(session, limit: int):
+    return [row._asdict() for row in (await session.execute(select(*URL_READ_COLUMNS).limit(limit))).all()]
+
+
+async def encode_before(entities) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=entities)
+    return JSONResponse(content).body
+
+
+async def encode_after(rows) -> bytes:
+    return ORJSONResponse(rows).body
+
+
+async def timed(fn, repeat: int) -> tuple[float, object]:
+    result = None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = await fn()
+    return time.perf_counter() - started, result
+
+
+async def main(rows: int, repeat: int) -> None:
+    try:
+        await reset_schema(async_engine)
+        user_id = await seed_user(async_engine, "serializer")
+        await seed_urls(async_engine, user_id, rows, prefix="row")
+
+        async with async_session_maker() as session:
+            #fresh identity map per fetch, like a request
+            async def entities():
+                session.expunge_all()
+                return await fetch_entities(session, rows)
+
+            fetch_before, sample_entities = await timed(entities, repeat)
+            fetch_after, sample_rows = await timed(lambda: fetch_rows(session, rows), repeat)
+
+        encode_before_seconds, body_before = await timed(lambda: encode_before(sample_entities), repeat)
+        encode_after_seconds, body_after = await timed(lambda: encode_after(sample_rows), repeat)
+
+        per_row = lambda seconds: seconds / (repeat * rows) * 1e6
+
+        print(f"{rows} rows x {repeat} repetitions, us per row")
+        print(f"{'':<10}{'fetch':>10}{'encode':>10}{'total':>10}")
+        print(f"{'before':<10}{per_row(fetch_before):>10.2f}{per_row(encode_before_seconds):>10.2f}{per_row(fetch_before + encode_before_seconds):>10.2f}")
+        print(f"{'after':<10}{per_row(fetch_after):>10.2f}{per_row(encode_after_seconds):>10.2f}{per_row(fetch_after + encode_after_seconds):>10.2f}")
+        print(f"encode speedup: {encode_before_seconds / encode_after_seconds:.1f}x, identical bodies: {body_before == body_after}")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,126 @@
+"""
+Benchmark: worker boot time, per DB_INIT_MODE.
+
+Each run is a fresh interpreter (a fresh worker), measuring:
+
+- import: `import src` (settings, engines, routers, module-level singletons)
+- startup: the lifespan up to `yield` (schema setup per DB_INIT_MODE, background workers)
+- first_request / second_request: two redirect cache misses right after startup; the
+  first one also pays for opening the first database connection and lazy set-up
+
+The database is created (and stamped with the Alembic head, for "verify") once, up front.
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+MODES = ("create_all", "skip", "verify")
+
+
+async def child() -> dict:
+    """
+    Runs inside the measured interpreter; everything before this is interpreter start-up.
+    """
+
+    started = time.perf_counter()
+    from src import app
+    imported = time.perf_counter()
+
+    import httpx
+    from src.app.db.main import async_engine
+
+    timings = {"import_ms": (imported - started) * 1000}
+
+    try:
+        async with app.router.lifespan_context(app):
+            timings["startup_ms"] = (time.perf_counter() - imported) * 1000
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name, code in zip(("first_request_ms", "second_request_ms"), json.loads(os.environ["BENCH_CODES"])):
+                    request_started = time.perf_counter()
+                    response = await client.get(f"/{code}")
+                    assert response.status_code == 307, response.status_code
+                    timings[name] = (time.perf_counter() - request_started) * 1000
+    finally:
+        await async_engine.dispose()
+
+    return timings
+
+
+async def prepare() -> list[str]:
+    from benchmarks.common import reset_schema, seed_user, seed_urls
+    from sqlalchemy import text
+    from src.app.db.main import async_engine, alembic_head_revisions
+
+    try:
+        await reset_schema(async_engine)
+        user_id = await seed_user(async_engine, "boot")
+        codes = await seed_urls(async_engine, user_id, 2, prefix="boot")
+
+        async with async_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            for head in alembic_head_revisions():
+                await conn.execute(text("INSERT INTO alembic_version VALUES (:head)"), {"head": head})
+    finally:
+        await async_engine.dispose()
+
+    return codes
+
+
+def measure(mode: str, env: dict) -> dict:
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env={**env, "DB_INIT_MODE": mode},
+        text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args) -> None:
+    import benchmarks.common  # noqa: F401  (sets DATABASE_URL for this process and the children)
+
+    codes = asyncio.run(prepare())
+
+    env = {**os.environ, "PYTHONPATH": os.getcwd(), "BENCH_CODES": json.dumps(codes)}
+    results = {}
+
+    for mode in args.modes:
+        runs = [measure(mode, env) for _ in range(args.runs)]
+        results[mode] = {
+            name: round(statistics.median(run[name] for run in runs), 2)
+            for name in runs[0]
+        }
+
+    print(f"{'mode':<12}{'import ms':>12}{'startup ms':>12}{'1st req ms':>12}{'2nd req ms':>12}")
+    for mode, timings in results.items():
+        print(
+            f"{mode:<12}{timings['import_ms']:>12.1f}{timings['startup_ms']:>12.1f}"
+            f"{timings['first_request_ms']:>12.2f}{timings['second_request_ms']:>12.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"runs": args.runs, "median": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(child())))
+    else:
+        main(args)
@@ -0,0 +1,236 @@
+"""
+Benchmark suite: the real stack (routes, services, caches, database) end to end.
+
+Seeds `--users` users and `--urls` URLs, then drives the app in-process over ASGI
+(httpx, no sockets) with the lifespan running, and measures:
+
+- redirect throughput / p50 / p99 under concurrency (lean `/{code}` and `/api/v1/urls/{code}`)
+- URL creation throughput
+- login throughput
+- `/api/v1/urls/me` latency vs. the owner's link count
+
+Results are written as JSON (`--output`) together with the commit, database and parameters.
+With `--baseline <older results>` the run is compared against it and exits non-zero if a
+throughput drops, or a latency grows, by more than `--tolerance`.
+
+    python -m benchmarks.suite --output bench-results.json
+    python -m benchmarks.suite --baseline bench-results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.common import reset_schema, seed_user, seed_urls, percentile
+
+import httpx
+from sqlalchemy.engine import make_url
+from src import app
+from src.app.core.config import Config
+from src.app.core.hashing import bcrypt_hash
+from src.app.db.main import async_engine
+
+
+PASSWORD = "Bench@2024"
+
+
+async def run_load(make_request, total: int, concurrency: int, ok_statuses: tuple = (200, 201, 307)) -> dict:
+    """
+    Sends `total` requests from `concurrency` workers; `make_request(i)` returns the i-th request.
+    """
+
+    samples = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+
+            started = time.perf_counter()
+            response = await make_request(index)
+            samples.append((time.perf_counter() - started) * 1000)
+
+            if response.status_code not in ok_statuses:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p99_ms": round(percentile(samples, 99), 3)
+    }
+
+
+async def login(client, username: str) -> dict:
+    response = await client.post("/api/v1/auth/login", json={"username": f"{username}@bench.local", "password": PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def seed(args) -> dict:
+    await reset_schema(async_engine)
+
+    #one real hash shared by every user, so seeding doesn't pay bcrypt per user
+    hashed_password = bcrypt_hash(PASSWORD)
+
+    users = [f"user{i}" for i in range(args.users)]
+    user_ids = [await seed_user(async_engine, username, hashed_password) for username in users]
+
+    codes = []
+    per_user = max(1, args.urls // len(user_ids))
+    for index, user_id in enumerate(user_ids):
+        codes += await seed_urls(async_engine, user_id, per_user, prefix=f"s{index}_")
+
+    owners = {}
+    for links in args.link_counts:
+        username = f"owner{links}"
+        user_id = await seed_user(async_engine, username, hashed_password)
+        await seed_urls(async_engine, user_id, links, prefix=f"o{links}_")
+        owners[links] = username
+
+    return {"users": users, "codes": codes, "owners": owners}
+
+
+async def run_suite(args) -> dict:
+    results = {}
+
+    try:
+        seeded = await seed(args)
+        users, codes = seeded["users"], seeded["codes"]
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                headers = await login(client, users[0])
+
+                #first pass fills the redirect cache; the timed runs measure the warm path
+                await run_load(lambda i: client.get(f"/{codes[i]}"), len(codes), args.concurrency)
+
+                results["redirect_lean"] = await run_load(
+                    lambda i: client.get(f"/{codes[i % len(codes)]}"), args.redirects, args.concurrency
+                )
+                results["redirect_api_v1"] = await run_load(
+                    lambda i: client.get(f"/api/v1/urls/{codes[i % len(codes)]}"), args.redirects, args.concurrency
+                )
+
+                results["create_url"] = await run_load(
+                    lambda i: client.post("/api/v1/urls", json={"original_url": f"https://example.com/new/{i}"}, headers=headers),
+                    args.creates, args.concurrency
+                )
+
+                results["login"] = await run_load(
+                    lambda i: client.post(
+                        "/api/v1/auth/login",
+                        json={"username": f"{users[i % len(users)]}@bench.local", "password": PASSWORD}
+                    ),
+                    args.logins, args.concurrency
+                )
+
+                results["urls_me"] = {}
+                for links, username in seeded["owners"].items():
+                    owner_headers = await login(client, username)
+                    results["urls_me"][str(links)] = await run_load(
+                        lambda i: client.get("/api/v1/urls/me", headers=owner_headers), args.list_requests, args.concurrency
+                    )
+    finally:
+        await async_engine.dispose()
+
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Regressions of `current` against `baseline`: lower throughput or higher latency
+    by more than `tolerance` (a fraction).
+    """
+
+    regressions = []
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+
+    for name, before in old.items():
+        after = new.get(name)
+        if after is None or not before:
+            continue
+
+        if name.endswith("requests_per_second") and after < before * (1 - tolerance):
+            regressions.append(f"{name}: {before} -> {after}")
+        elif name.endswith(("p50_ms", "p99_ms")) and after > before * (1 + tolerance):
+            regressions.append(f"{name}: {before} -> {after}")
+
+    return regressions
+
+
+def main(args) -> int:
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": make_url(Config.DATABASE_URL).get_backend_name(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": asyncio.run(run_suite(args))
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION vs {baseline.get('commit')}: {regression}", file=sys.stderr)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--urls", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--redirects", type=int, default=10000)
+    parser.add_argument("--creates", type=int, default=1000)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--list-requests", type=int, default=200)
+    parser.add_argument("--link-counts", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    sys.exit(main(args))
@@ -1,15 +1,43 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from src.app.api import auth, user, shortner
-from src.app.db.main import init_db
+from src.app.api import auth, user, shortner, monitoring, redirect
+from src.app.db.main import init_db, async_engine
+from src.app.core.clicks import click_aggregator, click_event_writer
+from src.app.core.visitors import visitor_counter
+from src.app.core.revocation import revocation_filter
+from src.app.core.hashing import hashing_pool
+from src.app.core.maintenance import maintenance_worker
+from src.app.core.warmup import cache_warmer
+from src.app.core.shared_cache import invalidation_bus, get_shared_store
+from src.app.core.metrics import MetricsMiddleware
+from src.app.core.config import Config
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Server is starting ..................")
     await init_db()
+    click_aggregator.start(async_engine)
+    click_event_writer.start(async_engine)
+    visitor_counter.start(async_engine)
+    await revocation_filter.start(async_engine)
+    maintenance_worker.start(async_engine)
+    invalidation_bus.start()
+    #runs in the background; /monitoring/ready reports 503 until it is done
+    cache_warmer.start(async_engine)
     yield
     print("Server is shutting down...........")
+    await cache_warmer.stop()
+    await maintenance_worker.stop()
+    await invalidation_bus.stop()
+    if get_shared_store() is not None:
+        await get_shared_store().close()
+    await revocation_filter.stop()
+    await click_aggregator.stop()
+    await click_event_writer.stop()
+    await visitor_counter.stop()
+    hashing_pool.shutdown()
     print("Server has been stopped")
 
 version = "v1"
@@ -19,6 +47,8 @@ app = FastAPI(
     description="An API for URL shortner",
     version=version,
     lifespan=lifespan,
+    #orjson instead of json.dumps for every JSON response
+    default_response_class=ORJSONResponse,
     license_info={
         "name": "MIT",
         "url": "https://opensource.org/licenses/mit"
@@ -37,10 +67,23 @@ app = FastAPI(
 app.include_router(auth.auth_router, prefix=f"/api/{version}/auth")
 app.include_router(user.user_router, prefix=f"/api/{version}")
 app.include_router(shortner.url_router, prefix=f"/api/{version}")
+app.include_router(monitoring.monitoring_router, prefix=f"/api/{version}")
+app.include_router(monitoring.metrics_router)
+
+if Config.METRICS_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        query_header=Config.DB_QUERY_HEADER,
+        query_warn_threshold=Config.DB_QUERY_WARN_THRESHOLD
+    )
 
 
 
 
 @app.get('/')
 async def root():
-    return {"URL Shortner API"}
\ No newline at end of file
+    return {"URL Shortner API"}
+
+
+#catch-all single segment path, so it has to stay the last route registered
+app.router.routes.append(redirect.redirect_route)
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, status, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, status, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from datetime import timedelta, datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.app.schemas import UserCreate, LoginData
 from src.app.services import user_services
 from src.app.db.main import get_session
-from src.app.core.utils import verify_password, create_access_token, blacklist_token, delete_expired_tokens
+from src.app.core.utils import verify_password, create_access_token, blacklist_token
 from src.app.core.dependencies import refresh_token, get_current_user
 from src.app.models import User
 
@@ -47,7 +47,7 @@ async def login(user_data: LoginData, session: AsyncSession=Depends(get_session)
 
     if user is not None:
 
-        validate_password = verify_password(password, user.hashed_password)
+        validate_password = await verify_password(password, user.hashed_password)
         if validate_password:
 
             #create access_token
@@ -88,7 +88,7 @@ async def login(user_data: LoginData, session: AsyncSession=Depends(get_session)
 
 
 @auth_router.post('/logout', status_code=status.HTTP_200_OK)
-async def logout(token: str, bg_task: BackgroundTasks, session: AsyncSession=Depends(get_session)):
+async def logout(token: str, session: AsyncSession=Depends(get_session)):
     try:
         await blacklist_token(token, session)
     except ValueError:
@@ -96,8 +96,8 @@ async def logout(token: str, bg_task: BackgroundTasks, session: AsyncSession=Dep
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid Token"
         )
-    bg_task.add_task(delete_expired_tokens, session)
-    
+
+    #expired tokens are purged by the maintenance worker (src/app/core/maintenance.py)
     return {"message": "Logged out successfully!"}
 
 @auth_router.get('/access_token', status_code=status.HTTP_200_OK)
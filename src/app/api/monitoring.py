@@ -0,0 +1,103 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse, JSONResponse
+from src.app.core.cache import redirect_cache, auth_cache
+from src.app.core.shared_cache import redirect_tier, invalidation_bus
+from src.app.core.clicks import click_aggregator, click_event_writer
+from src.app.core.visitors import visitor_counter
+from src.app.core.revocation import revocation_filter
+from src.app.core.hashing import hashing_pool
+from src.app.core.maintenance import maintenance_worker
+from src.app.core.warmup import cache_warmer
+from src.app.core.metrics import REGISTRY, CallbackMetric
+from src.app.db.main import pool_stats, replica_router
+
+
+monitoring_router = APIRouter(
+    tags=["Monitoring"]
+)
+
+metrics_router = APIRouter(
+    tags=["Monitoring"]
+)
+
+
+def cache_stat(key: str) -> dict:
+    return {
+        ("redirect",): redirect_cache.stats()[key],
+        ("auth",): auth_cache.stats()[key]
+    }
+
+
+#read from the counters the components keep anyway, only when /metrics is scraped
+CallbackMetric("cache_hits_total", "In-process cache hits.", "counter", lambda: cache_stat("hits"), ("cache",))
+CallbackMetric("cache_misses_total", "In-process cache misses.", "counter", lambda: cache_stat("misses"), ("cache",))
+CallbackMetric("cache_evictions_total", "In-process cache evictions.", "counter", lambda: cache_stat("evictions"), ("cache",))
+CallbackMetric("cache_entries", "In-process cache entries.", "gauge", lambda: cache_stat("size"), ("cache",))
+CallbackMetric("db_pool_checked_out", "Connections currently checked out of the primary pool.", "gauge", lambda: pool_stats().get("checked_out", 0))
+CallbackMetric("db_pool_checkout_timeouts_total", "Pool checkouts that timed out.", "counter", lambda: pool_stats().get("timeouts", 0))
+CallbackMetric("password_hash_queue_depth", "Password hashes waiting for a worker.", "gauge", lambda: hashing_pool.waiting)
+CallbackMetric("password_hash_rejected_total", "Password hashes rejected because the queue was full.", "counter", lambda: hashing_pool.rejected)
+CallbackMetric("click_counters_pending", "Clicks recorded but not yet flushed to urls.click_count.", "gauge", lambda: click_aggregator.stats()["pending_clicks"])
+CallbackMetric("click_events_dropped_total", "Click events dropped because the ring buffer was full.", "counter", lambda: click_event_writer.dropped)
+CallbackMetric("maintenance_urls_deactivated_total", "Expired URLs deactivated by the maintenance worker.", "counter", lambda: maintenance_worker.urls_deactivated)
+CallbackMetric("maintenance_tokens_purged_total", "Expired revoked tokens purged by the maintenance worker.", "counter", lambda: maintenance_worker.tokens_purged)
+
+
+@metrics_router.get('/metrics', include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@monitoring_router.get('/monitoring/cache', status_code=status.HTTP_200_OK)
+async def cache_stats():
+    return {
+        "redirect": {**redirect_cache.stats(), **redirect_tier.stats()},
+        "auth": auth_cache.stats(),
+        "invalidation": invalidation_bus.stats()
+    }
+
+
+@monitoring_router.get('/monitoring/clicks', status_code=status.HTTP_200_OK)
+async def click_stats():
+    return {
+        **click_aggregator.stats(),
+        "events": click_event_writer.stats(),
+        "visitors": visitor_counter.stats()
+    }
+
+
+@monitoring_router.get('/monitoring/revocations', status_code=status.HTTP_200_OK)
+async def revocation_stats():
+    return revocation_filter.stats()
+
+
+@monitoring_router.get('/monitoring/hashing', status_code=status.HTTP_200_OK)
+async def hashing_stats():
+    return hashing_pool.stats()
+
+
+@monitoring_router.get('/monitoring/maintenance', status_code=status.HTTP_200_OK)
+async def maintenance_stats():
+    return maintenance_worker.stats()
+
+
+@monitoring_router.get('/monitoring/ready', status_code=status.HTTP_200_OK)
+async def readiness():
+    """
+    Readiness probe: 503 until the redirect cache warm-up has finished (or given up).
+    """
+
+    warmup = cache_warmer.stats()
+    if not warmup["ready"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"ready": False, "warmup": warmup})
+
+    return {"ready": True, "warmup": warmup}
+
+
+@monitoring_router.get('/monitoring/db', status_code=status.HTTP_200_OK)
+async def db_stats():
+    return {
+        "primary": pool_stats(),
+        "replicas": replica_router.stats(),
+        "replica_primary_fallbacks": replica_router.primary_fallbacks
+    }
@@ -0,0 +1,99 @@
+from functools import lru_cache
+from datetime import datetime
+from starlette.requests import Request
+from starlette.responses import Response, RedirectResponse
+from starlette.routing import Match, Route
+from src.app.core.config import Config
+from src.app.schemas import SHORT_CODE_MIN_LENGTH, SHORT_CODE_MAX_LENGTH
+from src.app.core.utils import client_ip
+from src.app.services import url_services
+
+
+class PrebuiltResponse(Response):
+    """
+    A response built once and sent many times.
+    Headers are copied per send so middleware appending to them can't leak between requests.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": list(self.raw_headers)})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+NOT_FOUND_RESPONSE = PrebuiltResponse(
+    b'{"detail":"Shortcode does not exist or no longer active."}',
+    status_code=404,
+    media_type="application/json"
+)
+
+GONE_RESPONSE = PrebuiltResponse(
+    b'{"detail":"URL expired."}',
+    status_code=410,
+    media_type="application/json"
+)
+
+
+@lru_cache(maxsize=Config.REDIRECT_CACHE_SIZE)
+def redirect_response(location: str) -> PrebuiltResponse:
+    """
+    307 to `location`, built once per destination.
+    Safe to keep: whether a code may still redirect is decided before this is looked up.
+    """
+
+    response = RedirectResponse(location, status_code=307)
+    return PrebuiltResponse(status_code=307, headers={"location": response.headers["location"]})
+
+
+async def redirect(request: Request) -> Response:
+    """
+    `GET /{short_code}`: the public redirect.
+
+    A plain Starlette endpoint rather than a FastAPI route: no dependency graph,
+    no request/response models, and no database session unless the redirect cache misses.
+    """
+
+    short_code = request.path_params["short_code"]
+
+    #every other single-segment path lands here too; ones no short code can match cost no
+    #lookup and no negative cache entry pushing out hot links
+    if not SHORT_CODE_MIN_LENGTH <= len(short_code) <= SHORT_CODE_MAX_LENGTH:
+        return NOT_FOUND_RESPONSE
+
+    url = await url_services.resolve_short_code(short_code)
+
+    #expiry is checked first: the maintenance worker deactivates links once they expire
+    if url and url.expires_at and url.expires_at < datetime.now():
+        return GONE_RESPONSE
+
+    if not url or not url.is_active:
+        return NOT_FOUND_RESPONSE
+
+    #Starlette also routes HEAD here: link checkers and crawlers probing a link aren't clicks
+    if request.method != "HEAD":
+        user_agent = request.headers.get("user-agent")
+
+        await url_services.redirect_url(
+            url.short_code,
+            referrer=request.headers.get("referer"),
+            user_agent=user_agent,
+            country=request.headers.get(Config.CLICK_COUNTRY_HEADER),
+            visitor=f"{client_ip(request)}|{user_agent or ''}"
+        )
+
+    return redirect_response(str(url.original_url))
+
+
+class RedirectRoute(Route):
+    """
+    Records itself in the scope on a match, like FastAPI's APIRoute, so the metrics
+    middleware can label requests with the route template.
+    """
+
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        if match != Match.NONE:
+            child_scope["route"] = self
+        return match, child_scope
+
+
+redirect_route = RedirectRoute("/{short_code}", redirect, methods=["GET"], name="redirect")
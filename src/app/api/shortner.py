@@ -1,13 +1,20 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+import csv
+import io
+import json
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import RedirectResponse, JSONResponse
-from typing import List
-from src.app.schemas import URLRead, URLCreate
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from typing import List, AsyncIterator, Optional, Literal
+from src.app.schemas import URLRead, URLCreate, BulkURLResult, BulkURLItemResult, ClickStats
+from src.app.core.config import Config
+from src.app.core.pagination import decode_cursor, page_response
+from src.app.core.utils import client_ip
 from src.app.models import User
 from src.app.core.dependencies import get_current_user
-from src.app.db.main import get_session
+from src.app.db.main import get_session, get_read_session, read_session
 from src.app.services import url_services, user_services
-from datetime import datetime
+from datetime import datetime, timedelta
 
 url_router = APIRouter(
     tags=["URL Shortner"]
@@ -21,51 +28,287 @@ async def create_short_url(
     session: AsyncSession=Depends(get_session)
     ):
 
-    #checks if the short_code exists "i.e if it has been taken by another user"
-    check_existing = await url_services.existing_short_code(url_data.short_code, session)
-    
-    if check_existing:
+    #creates a new url short code; None means the custom short code has been taken by another user
+    new_url = await url_services.create_short_url(url_data, current_user, session)
+
+    if new_url is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Shortcode already exists. Please choose another or autogenerate."
         )
-    
-    #creates a new url short code
-    new_url = await url_services.create_short_url(url_data, current_user, session)
 
     return new_url
 
+
+async def read_bulk_items(request: Request) -> AsyncIterator[tuple]:
+    """
+    Yields `(index, URLCreate | error message)` for every item of a bulk upload.
+    Accepts a JSON array, or NDJSON (`application/x-ndjson`) which is parsed line by line
+    while the body is still streaming in.
+    """
+
+    def parse(index, item):
+        try:
+            return index, URLCreate.model_validate(item)
+        except ValidationError as e:
+            return index, e.errors()[0]["msg"]
+
+    def parse_line(index, line):
+        try:
+            return parse(index, json.loads(line))
+        except json.JSONDecodeError:
+            return index, "Invalid JSON"
+
+    if "ndjson" in request.headers.get("content-type", ""):
+        index = 0
+        buffer = b""
+
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+
+            for line in lines:
+                if line.strip():
+                    yield parse_line(index, line)
+                    index += 1
+
+        if buffer.strip():
+            yield parse_line(index, buffer)
+        return
+
+    try:
+        payload = await request.json()
+    except json.JSONDecodeError:
+        payload = None
+
+    if not isinstance(payload, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Expected a JSON array of URLs or an NDJSON body"
+        )
+
+    #checked before anything is inserted; NDJSON can only be cut short as it streams in
+    if len(payload) > Config.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A bulk request can contain at most {Config.BULK_MAX_ITEMS} URLs"
+        )
+
+    for index, item in enumerate(payload):
+        yield parse(index, item)
+
+
+@url_router.post('/urls/bulk', status_code=status.HTTP_200_OK, response_model=BulkURLResult)
+async def create_short_urls_bulk(
+    request: Request,
+    current_user: User=Depends(get_current_user),
+    session: AsyncSession=Depends(get_session)
+    ):
+
+    results: List[BulkURLItemResult] = []
+    batch: List[tuple] = []
+    truncated = False
+
+    async def flush_batch():
+        outcomes = await url_services.create_short_urls_bulk([item for _, item in batch], current_user, session)
+
+        for (index, item), (outcome, row) in zip(batch, outcomes):
+            if outcome == "created":
+                results.append(BulkURLItemResult(index=index, status=outcome, short_code=row["short_code"], url=row))
+            else:
+                results.append(BulkURLItemResult(index=index, status=outcome, short_code=item.short_code, detail="Shortcode already exists."))
+
+        batch.clear()
+
+    #items are inserted chunk by chunk, so one bad item never fails the whole upload
+    async for index, item in read_bulk_items(request):
+        #earlier chunks are already committed by now, so report them rather than fail the request
+        if index >= Config.BULK_MAX_ITEMS:
+            results.append(BulkURLItemResult(
+                index=index,
+                status="skipped",
+                detail=f"Over the limit of {Config.BULK_MAX_ITEMS} URLs per request; this and later items were not read."
+            ))
+            truncated = True
+            break
+
+        if isinstance(item, str):
+            results.append(BulkURLItemResult(index=index, status="invalid", detail=item))
+            continue
+
+        batch.append((index, item))
+        if len(batch) >= Config.BULK_INSERT_CHUNK:
+            await flush_batch()
+
+    if batch:
+        await flush_batch()
+
+    results.sort(key=lambda result: result.index)
+    created = sum(1 for result in results if result.status == "created")
+
+    return BulkURLResult(created=created, failed=len(results) - created, truncated=truncated, results=results)
+
+
 @url_router.get('/urls/me', status_code=status.HTTP_200_OK, response_model=List[URLRead])
 async def get_urls(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=Config.PAGE_SIZE_MAX),
+    active: Optional[bool] = None,
+    expired: Optional[bool] = None,
+    prefix: Optional[str] = Query(None, max_length=20),
     current_user: User=Depends(get_current_user),
-    session: AsyncSession=Depends(get_session)
+    session: AsyncSession=Depends(get_read_session)
     ):
+    """
+    The current user's links, newest first. Pass the `X-Next-Cursor` response header
+    back as `cursor` for the next page; `active`, `expired` and `prefix` (short_code) filter.
 
-    urls = await url_services.get_urls(current_user.id, session)
+    `response_model` documents the shape; the rows themselves are encoded directly (see `page_response`).
+    """
 
-    return urls
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
+    urls, next_cursor = await url_services.get_urls(
+        current_user.id,
+        session,
+        cursor=after,
+        limit=limit,
+        active=active,
+        expired=expired,
+        prefix=prefix
+    )
 
-@url_router.get('/urls/{short_code}', status_code=status.HTTP_200_OK)
-async def redirect_to_original_url(
+    return page_response(urls, next_cursor)
+
+
+EXPORT_FIELDS = ["id", "short_code", "original_url", "created_at", "expires_at", "click_count", "is_active"]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+async def export_chunks(user_id: int, export_format: str) -> AsyncIterator[str]:
+    """
+    Serializes a user's links batch by batch, one chunk of the response body per batch.
+
+    The session is opened here rather than taken from a dependency: FastAPI closes
+    yield-dependencies before a StreamingResponse body is sent.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+
+    if export_format == "csv":
+        writer.writeheader()
+
+    async with read_session() as session:
+        async for batch in url_services.stream_urls(user_id, session):
+            if export_format == "csv":
+                writer.writerows(batch)
+            else:
+                for row in batch:
+                    buffer.write(json.dumps(dict(row), default=datetime.isoformat))
+                    buffer.write("\n")
+
+            yield buffer.getvalue()
+
+            buffer.seek(0)
+            buffer.truncate()
+
+    #header only (csv) when the user has no links
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@url_router.get('/urls/me/export', status_code=status.HTTP_200_OK)
+async def export_urls(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User=Depends(get_current_user)
+    ):
+    """
+    Streams every link of the current user as NDJSON (one object per line) or CSV.
+    """
+
+    return StreamingResponse(
+        export_chunks(current_user.id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="urls.{format}"'}
+    )
+
+
+STATS_DEFAULT_WINDOWS = {
+    "minute": timedelta(hours=1),
+    "hour": timedelta(days=1),
+    "day": timedelta(days=30)
+}
+
+
+@url_router.get('/urls/{short_code}/stats', status_code=status.HTTP_200_OK, response_model=ClickStats)
+async def get_click_stats(
     short_code: str,
-    session: AsyncSession=Depends(get_session)
+    granularity: Literal["minute", "hour", "day"] = "hour",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User=Depends(get_current_user),
+    session: AsyncSession=Depends(get_read_session)
     ):
+    """
+    Click counts per minute, hour or day for one of your links.
+    Defaults to the last hour, day or 30 days respectively.
+    """
 
-    #checks if the short code is active or correct
-    url = await url_services.existing_short_code(short_code, session)
-    if not url or not url.is_active:
+    until = until or datetime.now()
+    since = since or until - STATS_DEFAULT_WINDOWS[granularity]
+
+    stats = await url_services.get_click_stats(short_code, current_user.id, granularity, since, until, session)
+    if not stats:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Shortcode does not exist or no longer active."
+            detail="Shortcode does not exist."
         )
-    
-    if url.expires_at and url.expires_at < datetime.now():
+
+    return stats
+
+
+@url_router.get('/urls/{short_code}', status_code=status.HTTP_200_OK)
+async def redirect_to_original_url(
+    short_code: str,
+    request: Request
+    ):
+
+    #checks if the short code is active or correct (served from the redirect cache when warm,
+    #a read session is only opened on a miss)
+    url = await url_services.resolve_short_code(short_code)
+
+    #expiry is checked first: the maintenance worker deactivates links once they expire
+    if url and url.expires_at and url.expires_at < datetime.now():
         raise HTTPException(
             status_code=status.HTTP_410_GONE,
             detail="URL expired."
         )
+
+    if not url or not url.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shortcode does not exist or no longer active."
+        )
     
-    await url_services.redirect_url(url.short_code, session)
+    user_agent = request.headers.get("user-agent")
+
+    await url_services.redirect_url(
+        url.short_code,
+        referrer=request.headers.get("referer"),
+        user_agent=user_agent,
+        country=request.headers.get(Config.CLICK_COUNTRY_HEADER),
+        visitor=f"{client_ip(request)}|{user_agent or ''}"
+    )
 
     return RedirectResponse(str(url.original_url), status_code=status.HTTP_307_TEMPORARY_REDIRECT)
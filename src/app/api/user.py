@@ -1,9 +1,11 @@
 from sqlalchemy.ext.asyncio.session import AsyncSession
-from fastapi import APIRouter, status, Depends, HTTPException
-from typing import List
-from src.app.db.main import get_session
+from fastapi import APIRouter, status, Depends, HTTPException, Query
+from typing import List, Optional
+from src.app.db.main import get_session, get_read_session
 from src.app.services import user_services
 from src.app.schemas import User, UserUpdate
+from src.app.core.config import Config
+from src.app.core.pagination import decode_cursor, page_response
 
 
 user_router = APIRouter(
@@ -11,14 +13,30 @@ user_router = APIRouter(
 )
 
 @user_router.get('/users', status_code=status.HTTP_200_OK, response_model=List[User])
-async def get_users(skip: int=0, limit: int=10, session: AsyncSession = Depends(get_session)):
+async def get_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=Config.PAGE_SIZE_MAX),
+    session: AsyncSession = Depends(get_read_session)
+    ):
+    """
+    Newest users first. Pass the `X-Next-Cursor` response header back as `cursor` for the next page.
+    Rows are encoded directly, `response_model` only documents them (see `page_response`).
+    """
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
-    users = await user_services.get_users(skip, limit, session)
+    users, next_cursor = await user_services.get_users(after, limit, session)
 
-    return users
+    return page_response(users, next_cursor)
 
 @user_router.get('/users/{user_id}', status_code=status.HTTP_200_OK, response_model=User)
-async def get_single_user(user_id: int, session: AsyncSession=Depends(get_session)):
+async def get_single_user(user_id: int, session: AsyncSession=Depends(get_read_session)):
 
     user = await user_services.get_user(user_id, session)
 
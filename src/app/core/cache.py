@@ -0,0 +1,223 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Hashable, NamedTuple, Optional
+from src.app.core.config import Config
+
+
+class ResolvedURL(NamedTuple):
+    """
+    The handful of columns the redirect path needs to answer a short code.
+    """
+    short_code: str
+    original_url: str
+    is_active: bool
+    expires_at: Optional[datetime]
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache where every entry also carries an expiry.
+
+    - Entries are evicted least-recently-used first once `maxsize` is reached.
+    - Expired entries are dropped lazily when they are read.
+    - hits / misses / evictions / expirations are counted so they can be scraped.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, self._MISSING)
+
+        if entry is self._MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (expires_at, value)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def contains(self, key: Hashable) -> bool:
+        """
+        Checks for a live entry without touching the counters or LRU order.
+        """
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def expires_in(self, key: Hashable) -> float:
+        """
+        Seconds until the entry expires (0 if it is missing), without touching the counters.
+        """
+        entry = self._data.get(key)
+        return max(0.0, entry[0] - time.monotonic()) if entry is not None else 0.0
+
+    def replace(self, key: Hashable, value: Any) -> None:
+        """
+        Swaps the value of an existing entry, keeping its expiry.
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data[key] = (entry[0], value)
+
+    def items(self) -> list:
+        return [(key, value) for key, (_, value) in self._data.items()]
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class AuthEntry(NamedTuple):
+    """
+    What the auth layer remembers about a verified token: its decoded claims, and
+    `user`, a slim `schemas.User` filled in by `get_current_user` on first use.
+    """
+    claims: dict
+    user: Any = None
+
+
+class AuthCache:
+    """
+    Token digest (`key_for`) -> `AuthEntry`, kept until the token's `exp` (capped at `max_ttl`).
+
+    A hit lets an authenticated request skip decoding the JWT and the user lookup; revocation
+    is still checked on every request, through the revocation filter.
+    Entries are dropped on logout (`invalidate`) and on user update/delete (`invalidate_user`).
+
+    In-process only, not in the shared store: a shared entry costs a round trip per request
+    on a cold worker, and stale users in it couldn't be found to drop on user update/delete.
+    """
+
+    def __init__(self, maxsize: int, max_ttl: float):
+        self.max_ttl = max_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=max_ttl)
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        #the raw token itself isn't kept around as a key
+        return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> AuthEntry | None:
+        return self._cache.get(key)
+
+    def ttl_for(self, entry: AuthEntry) -> float:
+        return min(self.max_ttl, entry.claims.get("exp", 0) - time.time())
+
+    def set(self, key: str, entry: AuthEntry, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl_for(entry) if ttl is None else ttl
+
+        if ttl > 0:
+            self._cache.set(key, entry, ttl=ttl)
+
+    def set_user(self, key: str, entry: AuthEntry, user: Any) -> None:
+        self._cache.replace(key, entry._replace(user=user))
+
+    def invalidate(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Drops every cached token of a user. A linear scan, but only runs on user update/delete.
+        """
+
+        stale = [
+            key for key, entry in self._cache.items()
+            if entry.claims.get("user", {}).get("user_id") == user_id
+        ]
+
+        for key in stale:
+            self._cache.invalidate(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+#marker stored for short codes that do not exist (negative caching)
+NOT_FOUND = object()
+
+
+def encode_resolved(value: ResolvedURL | object) -> bytes:
+    if value is NOT_FOUND:
+        return b"null"
+
+    expires_at = value.expires_at.isoformat() if value.expires_at else None
+    return json.dumps([value.short_code, value.original_url, value.is_active, expires_at]).encode()
+
+
+def decode_resolved(raw: bytes) -> ResolvedURL | object:
+    fields = json.loads(raw)
+    if fields is None:
+        return NOT_FOUND
+
+    short_code, original_url, is_active, expires_at = fields
+    return ResolvedURL(short_code, original_url, is_active, datetime.fromisoformat(expires_at) if expires_at else None)
+
+
+def redirect_ttl(value: ResolvedURL | object) -> float:
+    return Config.REDIRECT_CACHE_NEGATIVE_TTL if value is NOT_FOUND else Config.REDIRECT_CACHE_TTL
+
+
+redirect_cache = TTLCache(
+    maxsize=Config.REDIRECT_CACHE_SIZE,
+    ttl=Config.REDIRECT_CACHE_TTL
+)
+
+auth_cache = AuthCache(
+    maxsize=Config.AUTH_CACHE_SIZE,
+    max_ttl=Config.AUTH_CACHE_TTL
+)
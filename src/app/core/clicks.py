@@ -0,0 +1,307 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from datetime import datetime
+from sqlalchemy import bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import update
+from src.app.models import URL, ClickEvent, ClickRollup
+from src.app.core.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class ClickAggregator:
+    """
+    Write-behind buffer for URL click counts.
+
+    Redirects call `record()` which only bumps an in-memory counter. A background task
+    flushes the buffer every `flush_interval` seconds (or as soon as `flush_threshold`
+    clicks are pending) as one batched `UPDATE ... SET click_count = click_count + delta`.
+    """
+
+    def __init__(self, flush_interval: float, flush_threshold: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self._buffer: Counter = Counter()
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        self._engine = None
+
+        self.flushes = 0
+        self.flushed_clicks = 0
+        self.failed_flushes = 0
+
+    def record(self, short_code: str, count: int = 1) -> None:
+        self._buffer[short_code] += count
+        self._pending += count
+
+        if self._pending >= self.flush_threshold:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Writes every pending delta to the database in a single executemany.
+        Returns the number of clicks flushed; on failure the deltas are put back.
+        """
+
+        if not self._buffer or self._engine is None:
+            return 0
+
+        #swap the buffer first so clicks recorded while we await go into the next batch
+        pending, self._buffer = self._buffer, Counter()
+        self._pending = 0
+
+        statement = (
+            update(URL)
+            .where(URL.short_code == bindparam("code"))
+            .values(click_count=URL.click_count + bindparam("delta"))
+        )
+        #short_code order, so workers flushing overlapping codes lock their rows in the same order
+        params = [{"code": code, "delta": delta} for code, delta in sorted(pending.items())]
+
+        try:
+            async with self._engine.begin() as conn:
+                await conn.execute(statement, params)
+        except Exception:
+            logger.exception("Failed to flush %d click counters", len(pending))
+            self.failed_flushes += 1
+            self._buffer.update(pending)
+            self._pending += sum(pending.values())
+            return 0
+
+        total = sum(pending.values())
+        self.flushes += 1
+        self.flushed_clicks += total
+
+        return total
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self, engine) -> None:
+        self._engine = engine
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the background flusher and writes whatever is still buffered.
+        """
+
+        if self._task is not None:
+            #asked to exit, not cancelled: a flush cancelled mid-write would lose the batch it swapped out
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_clicks": self._pending,
+            "pending_codes": len(self._buffer),
+            "flushes": self.flushes,
+            "flushed_clicks": self.flushed_clicks,
+            "failed_flushes": self.failed_flushes
+        }
+
+
+#checked in order, so browsers whose user agent also mentions another engine come first
+USER_AGENT_FAMILIES = (
+    ("bot", "Bot"),
+    ("spider", "Bot"),
+    ("crawl", "Bot"),
+    ("curl/", "curl"),
+    ("edg/", "Edge"),
+    ("opr/", "Opera"),
+    ("firefox/", "Firefox"),
+    ("chrome/", "Chrome"),
+    ("safari/", "Safari")
+)
+
+ROLLUP_GRANULARITIES = {
+    "minute": lambda ts: ts.replace(second=0, microsecond=0),
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    "day": lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0)
+}
+
+
+def user_agent_family(user_agent: str | None) -> str:
+    if not user_agent:
+        return "Unknown"
+
+    user_agent = user_agent.lower()
+    for needle, family in USER_AGENT_FAMILIES:
+        if needle in user_agent:
+            return family
+
+    return "Other"
+
+
+def rollup_counts(events: list[tuple]) -> Counter:
+    """
+    Click counts per (short_code, granularity, bucket_start) for a batch of raw events.
+    """
+
+    counts = Counter()
+    for short_code, clicked_at, *_ in events:
+        for granularity, truncate in ROLLUP_GRANULARITIES.items():
+            counts[short_code, granularity, truncate(clicked_at)] += 1
+
+    return counts
+
+
+def rollup_upsert(dialect: str):
+    """
+    `INSERT ... ON CONFLICT DO UPDATE SET clicks = clicks + excluded.clicks` for the rollups.
+    """
+
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    statement = dialect_insert(ClickRollup)
+    return statement.on_conflict_do_update(
+        index_elements=["short_code", "granularity", "bucket_start"],
+        set_={"clicks": ClickRollup.clicks + statement.excluded.clicks}
+    )
+
+
+class ClickEventWriter:
+    """
+    Write-behind pipeline for per-click analytics.
+
+    Redirects call `record()`, which appends a tuple to a bounded in-memory ring buffer
+    (the oldest events are dropped if the writer falls behind). A background task drains
+    it every `flush_interval` seconds in batches of `batch_size`: each batch is bulk-inserted
+    into `click_events` and folded into the minute/hour/day `click_rollups` in the same
+    transaction. User agents are only classified here, off the redirect path.
+    """
+
+    def __init__(self, buffer_size: int, flush_interval: float, batch_size: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._engine = None
+
+        self.recorded = 0
+        self.written = 0
+        self.failed_batches = 0
+
+    def record(self, short_code: str, referrer: str | None = None, user_agent: str | None = None, country: str | None = None) -> None:
+        self._buffer.append((short_code, datetime.now(), referrer, user_agent, country))
+        self.recorded += 1
+
+    @property
+    def dropped(self) -> int:
+        return self.recorded - self.written - len(self._buffer)
+
+    async def write_batch(self, events: list[tuple]) -> None:
+        rows = [
+            {
+                "short_code": short_code,
+                "clicked_at": clicked_at,
+                "referrer": referrer[:255] if referrer else None,
+                "user_agent_family": user_agent_family(user_agent),
+                "country": country.upper()[:2] if country else None
+            }
+            for short_code, clicked_at, referrer, user_agent, country in events
+        ]
+        #key order, so concurrent writers upsert (and lock) overlapping rollup rows in the same order
+        rollups = [
+            {"short_code": short_code, "granularity": granularity, "bucket_start": bucket_start, "clicks": clicks}
+            for (short_code, granularity, bucket_start), clicks in sorted(rollup_counts(events).items())
+        ]
+
+        async with self._engine.begin() as conn:
+            await conn.execute(ClickEvent.__table__.insert(), rows)
+            await conn.execute(rollup_upsert(conn.dialect.name), rollups)
+
+    async def flush(self) -> int:
+        """
+        Drains the buffer batch by batch. Returns the number of events written;
+        a batch that fails is put back and retried on the next flush.
+        """
+
+        if self._engine is None:
+            return 0
+
+        written = 0
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+
+            try:
+                await self.write_batch(batch)
+            except Exception:
+                logger.exception("Failed to write %d click events", len(batch))
+                self.failed_batches += 1
+                self._buffer.extendleft(reversed(batch))
+                break
+
+            written += len(batch)
+            self.written += len(batch)
+
+        return written
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            await self.flush()
+
+    def start(self, engine) -> None:
+        self._engine = engine
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            #asked to exit, not cancelled, so a batch being written isn't lost
+            self._stopping.set()
+            await self._task
+            self._task = None
+            self._stopping.clear()
+
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "buffered_events": len(self._buffer),
+            "buffer_size": self._buffer.maxlen,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches
+        }
+
+
+click_aggregator = ClickAggregator(
+    flush_interval=Config.CLICK_FLUSH_INTERVAL,
+    flush_threshold=Config.CLICK_FLUSH_THRESHOLD
+)
+
+click_event_writer = ClickEventWriter(
+    buffer_size=Config.CLICK_EVENT_BUFFER_SIZE,
+    flush_interval=Config.CLICK_EVENT_FLUSH_INTERVAL,
+    batch_size=Config.CLICK_EVENT_BATCH_SIZE
+)
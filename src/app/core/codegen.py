@@ -0,0 +1,145 @@
+import asyncio
+import secrets
+import string
+from functools import lru_cache
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import update, insert
+from src.app.models import ShortCodeBlock
+from src.app.db.main import async_engine
+from src.app.core.config import Config
+
+
+ALPHABET = string.digits + string.ascii_letters
+
+#odd and not a multiple of 31, so it is invertible modulo 62**length for any length
+SCRAMBLE_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def base62_encode(number: int, length: int) -> str:
+    """
+    Encodes a non-negative integer as a zero-padded base62 string of `length` characters.
+    """
+
+    chars = []
+    for _ in range(length):
+        number, remainder = divmod(number, 62)
+        chars.append(ALPHABET[remainder])
+
+    if number:
+        raise ValueError("Number does not fit in the requested code length")
+
+    return ''.join(reversed(chars))
+
+
+class ShortCodeGenerator:
+    """
+    Base class for short code strategies.
+    Generators never probe the database for uniqueness: the unique index on
+    `urls.short_code` is the source of truth and callers retry on conflict.
+    """
+
+    async def next_code(self) -> str:
+        raise NotImplementedError("Override this method in child classes")
+
+
+class RandomCodeGenerator(ShortCodeGenerator):
+
+    def __init__(self, length: int):
+        self.length = length
+
+    async def next_code(self) -> str:
+        return ''.join(secrets.choice(ALPHABET) for _ in range(self.length))
+
+
+class SequenceCodeGenerator(ShortCodeGenerator):
+    """
+    Counter based codes.
+
+    - Each worker reserves `block_size` counter values at a time with a single
+      `UPDATE ... RETURNING` on `short_code_blocks`, then hands codes out of memory.
+    - With `scramble` on, counter values go through the bijection
+      `x -> (x * SCRAMBLE_MULTIPLIER + key) mod 62**length` before encoding, so
+      consecutive codes don't look sequential (obfuscation, not security).
+    """
+
+    def __init__(self, length: int, block_size: int, scramble: bool = True, key: int = 0, name: str = "short_code"):
+        self.length = length
+        self.block_size = block_size
+        self.scramble = scramble
+        self.name = name
+
+        self.keyspace = 62 ** length
+        self.multiplier = SCRAMBLE_MULTIPLIER % self.keyspace
+        self.key = key % self.keyspace
+
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+        self.blocks_allocated = 0
+
+    async def _allocate_block(self) -> None:
+        statement = (
+            update(ShortCodeBlock)
+            .where(ShortCodeBlock.name == self.name)
+            .values(next_value=ShortCodeBlock.next_value + self.block_size)
+            .returning(ShortCodeBlock.next_value)
+        )
+
+        while True:
+            try:
+                #own transaction: a reserved block must stay reserved even if the caller rolls back
+                async with async_engine.begin() as conn:
+                    end = (await conn.execute(statement)).scalar_one_or_none()
+
+                    if end is None:
+                        await conn.execute(
+                            insert(ShortCodeBlock).values(name=self.name, next_value=self.block_size)
+                        )
+                        end = self.block_size
+                break
+            except IntegrityError:
+                #another worker created the counter row first, take a block from it instead
+                continue
+
+        self._next, self._end = end - self.block_size, end
+        self.blocks_allocated += 1
+
+    def encode(self, value: int) -> str:
+        if value >= self.keyspace:
+            raise ValueError("Short code keyspace exhausted, increase SHORT_CODE_LENGTH")
+
+        if self.scramble:
+            value = (value * self.multiplier + self.key) % self.keyspace
+
+        return base62_encode(value, self.length)
+
+    async def next_code(self) -> str:
+        async with self._lock:
+            if self._next >= self._end:
+                await self._allocate_block()
+
+            value = self._next
+            self._next += 1
+
+        return self.encode(value)
+
+
+@lru_cache
+def get_code_generator() -> ShortCodeGenerator:
+    """
+    Builds the generator selected by `SHORT_CODE_STRATEGY` ("random" or "sequence").
+    """
+
+    if Config.SHORT_CODE_STRATEGY == "sequence":
+        return SequenceCodeGenerator(
+            length=Config.SHORT_CODE_LENGTH,
+            block_size=Config.SHORT_CODE_BLOCK_SIZE,
+            scramble=Config.SHORT_CODE_SCRAMBLE,
+            key=Config.SHORT_CODE_SCRAMBLE_KEY
+        )
+
+    if Config.SHORT_CODE_STRATEGY == "random":
+        return RandomCodeGenerator(length=Config.SHORT_CODE_LENGTH)
+
+    raise ValueError(f"Unknown SHORT_CODE_STRATEGY: {Config.SHORT_CODE_STRATEGY}")
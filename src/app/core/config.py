@@ -17,6 +17,107 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str
 
+    # database connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # schema setup at startup: "create_all", "skip" (alembic owns it) or "verify" (fail unless at the alembic head)
+    DB_INIT_MODE: str = "create_all"
+    ALEMBIC_CONFIG: str = "alembic.ini"
+
+    # read replicas (comma separated URLs, "round_robin" or "least_busy")
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_STRATEGY: str = "round_robin"
+    DB_REPLICA_RETRY_AFTER: float = 30.0
+
+    # redirect resolution cache (short_code -> original_url)
+    REDIRECT_CACHE_SIZE: int = 10000
+    REDIRECT_CACHE_TTL: int = 300
+    REDIRECT_CACHE_NEGATIVE_TTL: int = 30
+    #hits this close to expiry are served while the entry is reloaded in the background (0 disables)
+    REDIRECT_CACHE_REFRESH_AHEAD: float = 30.0
+    #>0: only one worker loads a missed code, the others wait up to this long for it (needs a shared cache)
+    REDIRECT_SHARED_LOCK_TTL: float = 0.0
+
+    # authenticated token cache (token digest -> claims + slim user)
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL: int = 300
+
+    # in-process token revocation filter
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_REFRESH_INTERVAL: float = 5.0
+    #re-read window for revocations committed late or stamped by a lagging clock
+    REVOCATION_REFRESH_OVERLAP: float = 60.0
+
+    # bcrypt worker pool ("thread" or "process")
+    PASSWORD_HASH_POOL: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 100
+
+    # write-behind click counter
+    CLICK_FLUSH_INTERVAL: float = 5.0
+    CLICK_FLUSH_THRESHOLD: int = 1000
+
+    # click analytics events
+    CLICK_EVENT_BUFFER_SIZE: int = 100000
+    CLICK_EVENT_FLUSH_INTERVAL: float = 2.0
+    CLICK_EVENT_BATCH_SIZE: int = 5000
+    CLICK_COUNTRY_HEADER: str = "cf-ipcountry"
+
+    # unique visitors (HyperLogLog)
+    VISITOR_HLL_PRECISION: int = 12
+    VISITOR_FLUSH_INTERVAL: float = 10.0
+    CLIENT_IP_HEADER: str = ""
+
+    # short code generation ("random" or "sequence")
+    SHORT_CODE_STRATEGY: str = "random"
+    SHORT_CODE_LENGTH: int = 8
+    SHORT_CODE_BLOCK_SIZE: int = 1000
+    SHORT_CODE_SCRAMBLE: bool = True
+    SHORT_CODE_SCRAMBLE_KEY: int = 0
+    SHORT_CODE_MAX_RETRIES: int = 5
+    #top-level paths served by the app or the proxy in front of it, never custom short codes (comma-separated)
+    RESERVED_SHORT_CODES: str = "api,docs,redoc,health,healthz,metrics,robots.txt"
+
+    # maintenance worker (expired URLs and revoked tokens)
+    MAINTENANCE_INTERVAL: float = 300.0
+    MAINTENANCE_BATCH_SIZE: int = 1000
+    MAINTENANCE_MAX_BATCHES: int = 100
+    MAINTENANCE_JITTER: float = 0.2
+    MAINTENANCE_LOCK_KEY: int = 4242001
+
+    # redirect cache warm-up at startup (0 links disables; source "click_count" or "recent")
+    WARMUP_LINKS: int = 0
+    WARMUP_TIME_BUDGET: float = 10.0
+    WARMUP_SOURCE: str = "click_count"
+    WARMUP_RECENT_DAYS: int = 7
+
+    # shared cache tier across workers: "none", "memory" (one process, tests) or "redis"
+    SHARED_CACHE_BACKEND: str = "none"
+    SHARED_CACHE_URL: str = "redis://localhost:6379/0"
+    SHARED_CACHE_PREFIX: str = "shortner"
+
+    # metrics
+    METRICS_ENABLED: bool = True
+
+    # per-request query accounting (needs METRICS_ENABLED)
+    DB_QUERY_HEADER: bool = False
+    DB_QUERY_WARN_THRESHOLD: int = 0
+
+    # keyset pagination
+    PAGE_SIZE_MAX: int = 100
+
+    # bulk shortening
+    BULK_MAX_ITEMS: int = 50000
+    BULK_INSERT_CHUNK: int = 1000
+
+    # streaming export
+    EXPORT_BATCH_SIZE: int = 1000
 
     model_config = SettingsConfigDict(
         env_file=env_file,
@@ -5,7 +5,9 @@ from fastapi.security.http import HTTPAuthorizationCredentials
 from src.app.core.utils import verify_access_token
 from src.app.db.main import get_session
 from src.app.core.utils import is_token_blacklisted
+from src.app.core.cache import auth_cache, AuthEntry
 from src.app.services import user_services
+from src.app.schemas import User
 
 
 class AccessPass(HTTPBearer):
@@ -16,34 +18,48 @@ class AccessPass(HTTPBearer):
         creds = await super().__call__(request)
 
         token = creds.credentials
-        
-        try:
-            token_data = verify_access_token(token)
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-                )
 
-        if not token_data:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token data"
-                )
-
-        if token_data.get('jti') is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Token missing JTI (likely expired)"
-                )
-
-            
-        if await is_token_blacklisted(token, session):
+        #a token seen before (and not yet past its exp) is neither decoded nor verified again
+        cache_key = auth_cache.key_for(token)
+        entry = auth_cache.get(cache_key)
+
+        if entry is None:
+            try:
+                token_data = verify_access_token(token)
+            except Exception:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired token"
+                    )
+
+            if not token_data:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid token data"
+                    )
+
+            if token_data.get('jti') is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Token missing JTI (likely expired)"
+                    )
+
+            entry = AuthEntry(claims=token_data)
+            auth_cache.set(cache_key, entry)
+
+        token_data = entry.claims
+
+        #checked on every request: a logout on another worker has to reach cached tokens too,
+        #and the revocation filter keeps this free of queries for tokens that aren't revoked
+        if await is_token_blacklisted(token_data['jti'], session):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Token has been revoked"
                 )
 
+        #handed to get_current_user, so the cache is read once per request
+        request.state.auth_key = cache_key
+        request.state.auth_entry = entry
         
         self.verify_token_data(token_data)
 
@@ -74,7 +90,14 @@ class RefreshTokenBearer(AccessPass):
             )
 
 
-async def get_current_user(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
+async def get_current_user(request: Request, token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)) -> User:
+    """
+    Returns a slim `schemas.User` for the token, cached alongside the token's claims.
+    """
+
+    entry = getattr(request.state, "auth_entry", None)
+    if entry is not None and entry.user is not None:
+        return entry.user
     
     user_email = token_details['user']['email']
 
@@ -86,7 +109,12 @@ async def get_current_user(token_details: dict = Depends(AccessTokenBearer()), s
             detail="Invalid credentials"
         )
 
-    return user
+    current_user = User.model_validate(user, from_attributes=True)
+
+    if entry is not None:
+        auth_cache.set_user(request.state.auth_key, entry, current_user)
+
+    return current_user
 
 
 refresh_token = RefreshTokenBearer()
\ No newline at end of file
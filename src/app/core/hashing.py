@@ -0,0 +1,119 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from src.app.core.config import Config
+from src.app.core.metrics import PASSWORD_HASH_SECONDS
+
+
+@lru_cache
+def get_passwd_context():
+    """
+    Built on first use instead of at import: passlib and its bcrypt backend are a
+    noticeable share of boot time, and most workers don't hash until the first login.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=['bcrypt']
+    )
+
+
+def bcrypt_hash(password: str) -> str:
+    return get_passwd_context().hash(password)
+
+def bcrypt_verify(password: str, hashed_password: str) -> bool:
+    return get_passwd_context().verify(password, hashed_password)
+
+
+class HashingPoolBusy(Exception):
+    pass
+
+
+class HashingPool:
+    """
+    Runs bcrypt on a dedicated, bounded worker pool so it never blocks the event loop.
+
+    - `kind` is "thread" (bcrypt releases the GIL) or "process".
+    - At most `workers` hashes run at once; up to `max_queue` more may wait for a slot,
+      beyond that `HashingPoolBusy` is raised instead of queueing without limit.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(workers)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HashingPoolBusy("Password hashing queue is full")
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started = time.perf_counter()
+        self.wait_seconds += started - queued_at
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            self.completed += 1
+            self.busy_seconds += elapsed
+            PASSWORD_HASH_SECONDS.observe(elapsed, fn.__name__.removeprefix("bcrypt_"))
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(bcrypt_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.run(bcrypt_verify, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_hash_ms": round(self.busy_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 2) if self.completed else 0.0
+        }
+
+
+hashing_pool = HashingPool(
+    kind=Config.PASSWORD_HASH_POOL,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    max_queue=Config.PASSWORD_HASH_MAX_QUEUE
+)
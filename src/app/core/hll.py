@@ -0,0 +1,108 @@
+import hashlib
+import math
+
+
+def _sigma(x: float) -> float:
+    if x == 1:
+        return math.inf
+
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x in (0, 1):
+        return 0.0
+
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality sketch (Flajolet et al.) with `2**precision` one-byte registers.
+
+    - Memory and storage are fixed: 4096 bytes at the default precision of 12,
+      whether it has seen ten visitors or ten million.
+    - Standard error is 1.04 / sqrt(2**precision), about 1.6% at precision 12:
+      roughly 68% of estimates fall within 1.6% of the true count, 95% within 3.3%
+      and 99.7% within 4.9%. Small counts are close to exact.
+    - Two sketches of the same precision merge by taking the register-wise maximum,
+      which gives exactly the sketch of the union (days, workers, ...).
+    """
+
+    def __init__(self, precision: int = 12, registers: bytes | None = None):
+        self.precision = precision
+        self.size = 1 << precision
+
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+
+        if len(self.registers) != self.size:
+            raise ValueError(f"Expected {self.size} registers, got {len(self.registers)}")
+
+    @staticmethod
+    def position(value: str, precision: int = 12) -> tuple[int, int]:
+        """
+        Register index and rank (position of the first set bit) of `value`.
+        """
+
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+        width = 64 - precision
+        remainder = x & ((1 << width) - 1)
+
+        return x >> width, width - remainder.bit_length() + 1
+
+    @property
+    def standard_error(self) -> float:
+        return 1.04 / math.sqrt(self.size)
+
+    def update(self, index: int, rank: int) -> None:
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, value: str) -> None:
+        self.update(*self.position(value, self.precision))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """
+        Cardinality estimate using Ertl's improved estimator ("New cardinality estimation
+        algorithms for HyperLogLog sketches", 2017). Unlike the original estimator with its
+        linear counting switch-over, it has no bias bump around 2.5 * 2**precision.
+        """
+
+        width = 64 - self.precision
+        histogram = [0] * (width + 2)
+        for rank in self.registers:
+            histogram[rank] += 1
+
+        if histogram[0] == self.size:
+            return 0
+
+        z = self.size * _tau(1 - histogram[width + 1] / self.size)
+        for k in range(width, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += self.size * _sigma(histogram[0] / self.size)
+
+        return round(self.size * self.size / (2 * math.log(2) * z))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
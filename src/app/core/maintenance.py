@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from sqlalchemy import func
+from sqlmodel import select, update, delete
+from src.app.models import URL, BlacklistedToken
+from src.app.core.shared_cache import redirect_tier
+from src.app.core.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceWorker:
+    """
+    Periodic clean-up, run by one worker at a time.
+
+    - Every `interval` seconds (+/- `jitter` as a fraction of it) it deactivates expired URLs
+      and purges expired `BlacklistedToken` rows, `batch_size` rows per transaction and at most
+      `max_batches` batches per task per run, so no run holds long locks.
+    - On Postgres a run only starts if `pg_try_advisory_lock(lock_key)` succeeds; workers that
+      lose the race skip that run instead of repeating the same work.
+    """
+
+    def __init__(self, interval: float, batch_size: int, max_batches: int, jitter: float, lock_key: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.jitter = jitter
+        self.lock_key = lock_key
+
+        self._task: asyncio.Task | None = None
+        self._engine = None
+
+        self.runs = 0
+        self.skipped_runs = 0
+        self.failed_runs = 0
+        self.urls_deactivated = 0
+        self.tokens_purged = 0
+        self.last_run: dict = {}
+
+    def _delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def deactivate_expired_urls(self) -> int:
+        total = 0
+
+        for _ in range(self.max_batches):
+            expired = (
+                select(URL.id)
+                .where(URL.is_active)
+                .where(URL.expires_at < datetime.now())
+                .limit(self.batch_size)
+            )
+            statement = (
+                update(URL)
+                .where(URL.id.in_(expired))
+                .values(is_active=False)
+                .returning(URL.short_code)
+            )
+
+            async with self._engine.begin() as conn:
+                codes = (await conn.execute(statement)).scalars().all()
+
+            await redirect_tier.invalidate_many(codes)
+
+            total += len(codes)
+            if len(codes) < self.batch_size:
+                break
+
+        return total
+
+    async def purge_expired_tokens(self) -> int:
+        total = 0
+
+        for _ in range(self.max_batches):
+            expired = (
+                select(BlacklistedToken.id)
+                .where(BlacklistedToken.expires_at < datetime.now())
+                .limit(self.batch_size)
+            )
+
+            async with self._engine.begin() as conn:
+                result = await conn.execute(delete(BlacklistedToken).where(BlacklistedToken.id.in_(expired)))
+
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+
+        return total
+
+    async def run_once(self) -> dict | None:
+        """
+        One maintenance pass. Returns its metrics, or None if another worker holds the lock.
+        """
+
+        async with self._engine.connect() as lock_conn:
+            postgres = lock_conn.dialect.name == "postgresql"
+
+            if postgres:
+                locked = (await lock_conn.execute(select(func.pg_try_advisory_lock(self.lock_key)))).scalar()
+                await lock_conn.commit()
+
+                if not locked:
+                    self.skipped_runs += 1
+                    return None
+
+            started = time.perf_counter()
+            try:
+                urls = await self.deactivate_expired_urls()
+                tokens = await self.purge_expired_tokens()
+            finally:
+                if postgres:
+                    await lock_conn.execute(select(func.pg_advisory_unlock(self.lock_key)))
+                    await lock_conn.commit()
+
+        self.runs += 1
+        self.urls_deactivated += urls
+        self.tokens_purged += tokens
+        self.last_run = {
+            "finished_at": datetime.now().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "urls_deactivated": urls,
+            "tokens_purged": tokens
+        }
+
+        return self.last_run
+
+    async def _run(self) -> None:
+        #spread the first run too, so workers started together don't all wake at once
+        await asyncio.sleep(random.uniform(0, self.interval * self.jitter))
+
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Maintenance run failed")
+                self.failed_runs += 1
+
+            await asyncio.sleep(self._delay())
+
+    def start(self, engine) -> None:
+        self._engine = engine
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "batch_size": self.batch_size,
+            "runs": self.runs,
+            "skipped_runs": self.skipped_runs,
+            "failed_runs": self.failed_runs,
+            "urls_deactivated": self.urls_deactivated,
+            "tokens_purged": self.tokens_purged,
+            "last_run": self.last_run
+        }
+
+
+maintenance_worker = MaintenanceWorker(
+    interval=Config.MAINTENANCE_INTERVAL,
+    batch_size=Config.MAINTENANCE_BATCH_SIZE,
+    max_batches=Config.MAINTENANCE_MAX_BATCHES,
+    jitter=Config.MAINTENANCE_JITTER,
+    lock_key=Config.MAINTENANCE_LOCK_KEY
+)
@@ -0,0 +1,294 @@
+import time
+import logging
+from bisect import bisect_left
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable
+from sqlalchemy import event
+
+
+logger = logging.getLogger(__name__)
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5, 5.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Registry:
+    """
+    Holds every metric and renders them in the Prometheus text exposition format (0.0.4).
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labelnames, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict = {}
+
+        registry.register(self)
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, self.labelnames, labels, value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+
+class CallbackMetric(Metric):
+    """
+    Read at scrape time from state the app keeps anyway (cache statistics, pool sizes, ...),
+    so it adds nothing to the hot path. `callback` returns a number, or a dict of
+    label tuple -> number.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, callback: Callable, labelnames: tuple = (), registry: Registry = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        value = self.callback()
+        values = value if isinstance(value, dict) else {(): value}
+
+        for labels, value in values.items():
+            yield self.name, self.labelnames, labels, value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS, registry: Registry = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def samples(self):
+        labelnames = self.labelnames + ("le",)
+
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", labelnames, labels + (bound,), cumulative
+
+            yield f"{self.name}_sum", self.labelnames, labels, total
+            yield f"{self.name}_count", self.labelnames, labels, cumulative
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+REQUEST_DB_QUERIES = Histogram("http_request_db_queries", "Database queries issued per HTTP request.", ("route",), buckets=QUERY_COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Database time per HTTP request.", ("route",))
+
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Duration of individual database statements.")
+DB_POOL_WAIT_SECONDS = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", buckets=POOL_WAIT_BUCKETS)
+
+PASSWORD_HASH_SECONDS = Histogram("password_hash_duration_seconds", "bcrypt time per operation.", ("operation",), buckets=HASH_BUCKETS)
+
+SHORT_CODES_GENERATED = Counter("short_codes_generated_total", "Short codes drawn from the code generator.")
+SHORT_CODE_RETRIES = Counter("short_code_retries_total", "Generated short codes that collided and were redrawn.")
+
+
+class RequestStats:
+    """
+    Per-request database accounting, filled in by the engine event hooks below.
+    With `record` on, the SQL of every statement is kept too (tests and debugging only).
+    """
+
+    __slots__ = ("queries", "query_seconds", "statements")
+
+    def __init__(self, record: bool = False):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.statements: list[str] | None = [] if record else None
+
+    def merge(self, other: "RequestStats") -> None:
+        self.queries += other.queries
+        self.query_seconds += other.query_seconds
+        if self.statements is not None and other.statements is not None:
+            self.statements.extend(other.statements)
+
+    def repeated(self) -> dict[str, int]:
+        """
+        Statements that ran more than once, the usual sign of an N+1 query pattern.
+        """
+
+        counts = StatementCounter(self.statements or ())
+        return {statement: count for statement, count in counts.items() if count > 1}
+
+
+#set by MetricsMiddleware for the duration of a request; None in background tasks
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    DB_QUERY_SECONDS.observe(elapsed)
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+        if stats.statements is not None:
+            stats.statements.append(statement)
+
+
+def instrument_engine(sync_engine) -> None:
+    """
+    Times every statement of an engine (pass `async_engine.sync_engine` for async ones).
+    """
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def count_queries():
+    """
+    Counts (and records) every statement run inside the block, including those of
+    requests served meanwhile: `with count_queries() as stats: ...`.
+    """
+
+    stats = RequestStats(record=True)
+    token = current_request.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request.reset(token)
+
+
+def route_label(scope: dict) -> str:
+    route = scope.get("route")
+    #unmatched paths share one label so random URLs can't blow up the label set
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead) recording
+    latency, status codes, in-flight requests and database work per route.
+
+    - With `query_header` on, responses carry `X-DB-Queries` / `X-DB-Time-Ms`.
+    - Requests running more than `query_warn_threshold` statements are logged (0 disables).
+    """
+
+    def __init__(self, app, query_header: bool = False, query_warn_threshold: int = 0):
+        self.app = app
+        self.query_header = query_header
+        self.query_warn_threshold = query_warn_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        #an enclosing count_queries() (e.g. a test's query budget) sees this request's statements too
+        outer = current_request.get()
+        stats = RequestStats(record=outer is not None and outer.statements is not None)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.query_header:
+                    message = {**message, "headers": [
+                        *message.get("headers", ()),
+                        (b"x-db-queries", str(stats.queries).encode()),
+                        (b"x-db-time-ms", f"{stats.query_seconds * 1000:.2f}".encode())
+                    ]}
+            await send(message)
+
+        token = current_request.set(stats)
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            current_request.reset(token)
+
+            route = route_label(scope)
+            method = scope["method"]
+
+            HTTP_REQUESTS.inc(method, route, status_code)
+            HTTP_LATENCY.observe(elapsed, method, route)
+            REQUEST_DB_QUERIES.observe(stats.queries, route)
+            REQUEST_DB_SECONDS.observe(stats.query_seconds, route)
+
+            if outer is not None:
+                outer.merge(stats)
+
+            if self.query_warn_threshold and stats.queries > self.query_warn_threshold:
+                logger.warning("%s %s ran %d queries (%.1f ms)", method, route, stats.queries, stats.query_seconds * 1000)
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s ran %d queries (%.1f ms)", method, route, stats.queries, stats.query_seconds * 1000)
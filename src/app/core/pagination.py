@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import datetime
+from fastapi.responses import ORJSONResponse
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Opaque keyset cursor pointing just past the row (created_at, id).
+    """
+
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Inverse of `encode_cursor`. Raises ValueError for anything that isn't one of our cursors.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def page_with_cursor(rows, limit: int):
+    """
+    Trims the extra row fetched to detect a next page and builds the cursor for it.
+    Returns `(rows, next_cursor)`; `next_cursor` is None on the last page.
+    """
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def page_response(rows: list[dict], next_cursor: str | None) -> ORJSONResponse:
+    """
+    A page of plain rows straight to JSON bytes (orjson), with the `X-Next-Cursor` header.
+    For rows read from our own tables only: they skip `response_model` validation.
+    """
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return ORJSONResponse(rows, headers=headers)
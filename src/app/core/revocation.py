@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta
+from sqlmodel import select
+from src.app.models import BlacklistedToken
+from src.app.core.config import Config
+from src.app.core.shared_cache import invalidation_bus
+
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+    Sized for `capacity` items at `error_rate` false positives; never gives false negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        #double hashing (Kirsch-Mitzenmacher) instead of k independent hash functions
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationFilter:
+    """
+    In-process filter of revoked token jtis.
+
+    - Loaded from `blacklistedtokens` at startup and topped up every `refresh_interval`
+      seconds with rows revoked since (so revocations made by other workers are picked up).
+    - Each top-up re-reads the last `overlap` seconds of revocations: a row can commit
+      after a later one has already been read, and ids or timestamps alone would skip it.
+    - `might_be_revoked()` answers the common "not revoked" case without touching Postgres;
+      only probable positives have to be confirmed with a query.
+    - Until the first load completes every jti is treated as a probable positive; a failed
+      load is retried on the next refresh.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, refresh_interval: float, overlap: float = 60.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.overlap = overlap
+
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.loaded = False
+        self._last_revoked_at: datetime | None = None
+        self._engine = None
+        self._task: asyncio.Task | None = None
+
+        self.definite_negatives = 0
+        self.probable_positives = 0
+
+    async def _load_since(self, since: datetime | None) -> None:
+        statement = (
+            select(BlacklistedToken.jti, BlacklistedToken.revoked_at)
+            .where(BlacklistedToken.expires_at > datetime.now())
+        )
+        if since is not None:
+            statement = statement.where(BlacklistedToken.revoked_at >= since)
+
+        async with self._engine.connect() as conn:
+            result = await conn.stream(statement)
+
+            async for jti, revoked_at in result:
+                #rows of the overlap window are read again, count them once
+                if jti and jti not in self.bloom:
+                    self.bloom.add(jti)
+                if self._last_revoked_at is None or revoked_at > self._last_revoked_at:
+                    self._last_revoked_at = revoked_at
+
+    async def load(self) -> None:
+        """
+        Rebuilds the filter from scratch, growing it if it has outgrown its capacity.
+        """
+
+        while self.capacity < self.bloom.count:
+            self.capacity *= 2
+
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self._last_revoked_at = None
+
+        await self._load_since(None)
+        self.loaded = True
+
+    async def refresh(self) -> None:
+        if not self.loaded or self.bloom.count > self.capacity:
+            await self.load()
+        elif self._last_revoked_at is not None:
+            await self._load_since(self._last_revoked_at - timedelta(seconds=self.overlap))
+        else:
+            await self._load_since(None)
+
+    def add(self, jti: str) -> None:
+        self.bloom.add(jti)
+
+    def might_be_revoked(self, jti: str) -> bool:
+        if self.loaded and jti not in self.bloom:
+            self.definite_negatives += 1
+            return False
+
+        self.probable_positives += 1
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the token revocation filter")
+
+    async def start(self, engine) -> None:
+        self._engine = engine
+
+        try:
+            await self.load()
+        except Exception:
+            logger.exception("Failed to load the token revocation filter, falling back to the database until it loads")
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "capacity": self.capacity,
+            "revoked_tokens": self.bloom.count,
+            "size_bytes": len(self.bloom.bits),
+            "definite_negatives": self.definite_negatives,
+            "probable_positives": self.probable_positives
+        }
+
+
+revocation_filter = RevocationFilter(
+    capacity=Config.REVOCATION_FILTER_CAPACITY,
+    error_rate=Config.REVOCATION_FILTER_ERROR_RATE,
+    refresh_interval=Config.REVOCATION_REFRESH_INTERVAL,
+    overlap=Config.REVOCATION_REFRESH_OVERLAP
+)
+
+
+def _revoked_elsewhere(jtis: list[str]) -> None:
+    for jti in jtis:
+        revocation_filter.add(jti)
+
+
+#tokens revoked by other workers go straight into this worker's filter
+invalidation_bus.on("revoked", _revoked_elsewhere)
@@ -0,0 +1,500 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterable
+from src.app.core.cache import redirect_cache, auth_cache, encode_resolved, decode_resolved, redirect_ttl
+from src.app.core.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class SharedStore:
+    """
+    Base class for the cache store shared by every worker (L2).
+    Keys are strings, values bytes; `subscribe` yields `(channel, message)` pairs.
+    """
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError("Override this method in child classes")
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError("Override this method in child classes")
+
+    async def set_many(self, items: list[tuple[str, bytes, float]]) -> None:
+        for key, value, ttl in items:
+            await self.set(key, value, ttl)
+
+    async def set_if_absent(self, key: str, value: bytes, ttl: float) -> bool:
+        """
+        Sets the key only if it doesn't exist yet (a lock); True if this call set it.
+        """
+        raise NotImplementedError("Override this method in child classes")
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError("Override this method in child classes")
+
+    async def publish(self, channel: str, message: str) -> None:
+        raise NotImplementedError("Override this method in child classes")
+
+    def subscribe(self, channels: list[str]) -> AsyncIterator[tuple[str, str]]:
+        raise NotImplementedError("Override this method in child classes")
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryStore(SharedStore):
+    """
+    In-process stand-in for Redis: expiring keys and pub/sub over asyncio queues.
+    Only shared between caches of the same process (tests, single-worker runs).
+    """
+
+    def __init__(self):
+        self._data: dict[str, tuple[float, bytes]] = {}
+        self._subscribers: list[tuple[set, asyncio.Queue]] = []
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    async def set_if_absent(self, key: str, value: bytes, ttl: float) -> bool:
+        if await self.get(key) is not None:
+            return False
+
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for channels, queue in self._subscribers:
+            if channel in channels:
+                queue.put_nowait((channel, message))
+
+    async def subscribe(self, channels: list[str]) -> AsyncIterator[tuple[str, str]]:
+        subscriber = (set(channels), asyncio.Queue())
+        self._subscribers.append(subscriber)
+        try:
+            while True:
+                yield await subscriber[1].get()
+        finally:
+            self._subscribers.remove(subscriber)
+
+
+class RedisStore(SharedStore):
+    """
+    Redis (or anything speaking its protocol) through `redis.asyncio`.
+    """
+
+    def __init__(self, url: str):
+        #optional dependency, only needed with SHARED_CACHE_BACKEND=redis
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def set_many(self, items: list[tuple[str, bytes, float]]) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value, ttl in items:
+                pipe.set(key, value, px=max(1, int(ttl * 1000)))
+            await pipe.execute()
+
+    async def set_if_absent(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(await self._client.set(key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self._client.publish(channel, message)
+
+    async def subscribe(self, channels: list[str]) -> AsyncIterator[tuple[str, str]]:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(*channels)
+        try:
+            async for message in pubsub.listen():
+                yield message["channel"].decode(), message["data"].decode()
+        finally:
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class InvalidationBus:
+    """
+    Fans invalidations out to every worker over the store's pub/sub.
+
+    - `on(name, handler)` registers what to do with keys invalidated elsewhere.
+    - A worker ignores its own messages (it has already applied them locally).
+    - The subscription is re-established if the store connection drops.
+    """
+
+    def __init__(self, store: SharedStore | None, prefix: str):
+        self.store = store
+        self.prefix = prefix
+        self.origin = uuid.uuid4().hex
+
+        self._handlers: dict[str, Callable[[list[str]], Any]] = {}
+        self._task: asyncio.Task | None = None
+
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    def channel(self, name: str) -> str:
+        return f"{self.prefix}:invalidate:{name}"
+
+    def on(self, name: str, handler: Callable[[list[str]], Any]) -> None:
+        self._handlers[self.channel(name)] = handler
+
+    async def publish(self, name: str, keys: Iterable[Hashable]) -> None:
+        keys = [str(key) for key in keys]
+        if self.store is None or not keys:
+            return
+
+        try:
+            await self.store.publish(self.channel(name), json.dumps({"origin": self.origin, "keys": keys}))
+            self.published += 1
+        except Exception:
+            self.errors += 1
+            logger.warning("Failed to publish %s invalidation", name, exc_info=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async for channel, message in self.store.subscribe(list(self._handlers)):
+                    payload = json.loads(message)
+                    if payload["origin"] == self.origin:
+                        continue
+
+                    self.received += 1
+                    self._handlers[channel](payload["keys"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("Invalidation subscription failed, resubscribing")
+                await asyncio.sleep(1.0)
+
+    def start(self) -> None:
+        if self.store is not None and self._handlers and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "subscribed": self._task is not None,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors
+        }
+
+
+class TwoTierCache:
+    """
+    An in-process cache (L1) in front of the shared store (L2).
+
+    - Reads try L1, then L2 (filling L1 on a hit); writes go to both.
+    - `ttl_of(value)` gives an entry's lifetime in both tiers.
+    - Invalidations drop the key from both tiers and from every other worker's L1;
+      `replace_many` stores new values and drops the stale ones elsewhere.
+    - With no store configured, or when it fails, this is just the L1 cache.
+
+    `get_or_load` adds miss handling on top:
+
+    - Concurrent misses for a key share one `loader()` call (single flight).
+    - With `lock_ttl` set, workers also take a lock in the store so only one of them
+      loads; the others wait up to `lock_ttl` seconds for the value to appear in L2.
+    - An L1 hit within `refresh_ahead` seconds of expiry is served as is while the
+      entry is reloaded in the background (stale-while-revalidate). Entries living
+      no longer than `refresh_ahead` are left to expire.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        local,
+        store: SharedStore | None,
+        bus: InvalidationBus,
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+        ttl_of: Callable[[Any], float],
+        refresh_ahead: float = 0.0,
+        lock_ttl: float = 0.0,
+        lock_poll: float = 0.02
+    ):
+        self.name = name
+        self.local = local
+        self.store = store
+        self.bus = bus
+        self.encode = encode
+        self.decode = decode
+        self.ttl_of = ttl_of
+        self.refresh_ahead = refresh_ahead
+        self.lock_ttl = lock_ttl
+        self.lock_poll = lock_poll
+
+        self._flights: dict[Hashable, asyncio.Task] = {}
+
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.lock_waits = 0
+
+        bus.on(name, self._invalidate_local)
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.bus.prefix}:{self.name}:{key}"
+
+    def _invalidate_local(self, keys: list[str]) -> None:
+        for key in keys:
+            self.local.invalidate(key)
+
+    async def get(self, key: Hashable) -> Any:
+        value = self.local.get(key)
+        if value is not None or self.store is None:
+            return value
+
+        return await self._get_shared(key)
+
+    async def _get_shared(self, key: Hashable) -> Any:
+        try:
+            raw = await self.store.get(self._key(key))
+        except Exception:
+            self.shared_errors += 1
+            logger.warning("Shared cache read failed for %s", self.name, exc_info=True)
+            return None
+
+        if raw is None:
+            self.shared_misses += 1
+            return None
+
+        self.shared_hits += 1
+        value = self.decode(raw)
+        self.local.set(key, value, self.ttl_of(value))
+
+        return value
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The cached value, else `loader()`'s result (cached before it is returned).
+        The load may be shared with other callers or run in the background, so `loader`
+        must not depend on the calling request (e.g. its database session).
+        """
+
+        value = self.local.get(key)
+        if value is not None:
+            if self.refresh_ahead and key not in self._flights and self._needs_refresh(key, value):
+                self.refreshes += 1
+                self._start_flight(key, loader, background=True)
+            return value
+
+        if self.store is not None:
+            value = await self._get_shared(key)
+            if value is not None:
+                return value
+
+        task = self._flights.get(key)
+        if task is None:
+            task = self._start_flight(key, loader)
+        else:
+            self.coalesced += 1
+
+        #shielded: a caller that goes away doesn't cancel the lookup the others are waiting on
+        return await asyncio.shield(task)
+
+    def _needs_refresh(self, key: Hashable, value: Any) -> bool:
+        #short-lived entries (e.g. negative ones) just expire, refreshing them would never stop
+        return self.local.expires_in(key) < self.refresh_ahead < self.ttl_of(value)
+
+    def _start_flight(self, key: Hashable, loader: Callable[[], Awaitable[Any]], background: bool = False) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, loader))
+        self._flights[key] = task
+
+        def finished(task: asyncio.Task) -> None:
+            self._flights.pop(key, None)
+            if not task.cancelled() and task.exception() is not None and background:
+                logger.warning("Background refresh of %s %r failed", self.name, key, exc_info=task.exception())
+
+        task.add_done_callback(finished)
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if self.store is None or not self.lock_ttl:
+            return await self._load_and_set(key, loader)
+
+        lock = f"{self.bus.prefix}:lock:{self.name}:{key}"
+        try:
+            acquired = await self.store.set_if_absent(lock, self.bus.origin.encode(), self.lock_ttl)
+        except Exception:
+            self.shared_errors += 1
+            acquired = True
+
+        if acquired:
+            try:
+                return await self._load_and_set(key, loader)
+            finally:
+                try:
+                    await self.store.delete(lock)
+                except Exception:
+                    self.shared_errors += 1
+
+        #another worker is loading it: wait for the value to land in the shared tier
+        self.lock_waits += 1
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll)
+            value = await self._get_shared(key)
+            if value is not None:
+                return value
+
+        return await self._load_and_set(key, loader)
+
+    async def _load_and_set(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self.loads += 1
+        value = await loader()
+        await self.set(key, value)
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        await self.set_many([(key, value)])
+
+    async def set_many(self, items: list[tuple[Hashable, Any]]) -> None:
+        shared = []
+        for key, value in items:
+            ttl = self.ttl_of(value)
+            if ttl <= 0:
+                continue
+
+            self.local.set(key, value, ttl)
+            shared.append((self._key(key), self.encode(value), ttl))
+
+        if self.store is None or not shared:
+            return
+
+        try:
+            await self.store.set_many(shared)
+        except Exception:
+            self.shared_errors += 1
+            logger.warning("Shared cache write failed for %s", self.name, exc_info=True)
+
+    async def replace_many(self, items: list[tuple[Hashable, Any]]) -> None:
+        """
+        `set_many`, then drops the keys from every other worker's L1, e.g. the negative
+        entries of short codes that have just been created. They reload from the shared tier.
+        """
+
+        await self.set_many(items)
+        await self.bus.publish(self.name, [key for key, _ in items])
+
+    async def invalidate(self, key: Hashable) -> None:
+        await self.invalidate_many([key])
+
+    async def invalidate_many(self, keys: list[Hashable]) -> None:
+        for key in keys:
+            self.local.invalidate(key)
+
+        if self.store is None or not keys:
+            return
+
+        try:
+            await self.store.delete(*(self._key(key) for key in keys))
+        except Exception:
+            self.shared_errors += 1
+            logger.warning("Shared cache delete failed for %s", self.name, exc_info=True)
+
+        await self.bus.publish(self.name, keys)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__ if self.store is not None else None,
+            "shared_hits": self.shared_hits,
+            "shared_misses": self.shared_misses,
+            "shared_errors": self.shared_errors,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "lock_waits": self.lock_waits
+        }
+
+
+@lru_cache
+def get_shared_store() -> SharedStore | None:
+    """
+    Builds the store selected by `SHARED_CACHE_BACKEND` ("none", "memory" or "redis").
+    """
+
+    if Config.SHARED_CACHE_BACKEND == "none":
+        return None
+
+    if Config.SHARED_CACHE_BACKEND == "memory":
+        return MemoryStore()
+
+    if Config.SHARED_CACHE_BACKEND == "redis":
+        return RedisStore(Config.SHARED_CACHE_URL)
+
+    raise ValueError(f"Unknown SHARED_CACHE_BACKEND: {Config.SHARED_CACHE_BACKEND}")
+
+
+async def invalidate_user(user_id: int) -> None:
+    """
+    Drops every cached token of a user, in this worker and the others.
+    """
+
+    auth_cache.invalidate_user(user_id)
+    await invalidation_bus.publish("auth_user", [user_id])
+
+
+def _invalidate_users(user_ids: list[str]) -> None:
+    for user_id in user_ids:
+        auth_cache.invalidate_user(int(user_id))
+
+
+invalidation_bus = InvalidationBus(get_shared_store(), prefix=Config.SHARED_CACHE_PREFIX)
+invalidation_bus.on("auth_user", _invalidate_users)
+
+redirect_tier = TwoTierCache(
+    name="redirect",
+    local=redirect_cache,
+    store=get_shared_store(),
+    bus=invalidation_bus,
+    encode=encode_resolved,
+    decode=decode_resolved,
+    ttl_of=redirect_ttl,
+    refresh_ahead=Config.REDIRECT_CACHE_REFRESH_AHEAD,
+    lock_ttl=Config.REDIRECT_SHARED_LOCK_TTL
+)
@@ -1,44 +1,68 @@
 import jwt
-import string
 import logging
-import secrets
-from fastapi import HTTPException, status
-from sqlmodel import select, delete
+from fastapi import HTTPException, Request, status
+from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
 from uuid import uuid4
 from datetime import datetime, timedelta
-from src.app.models import BlacklistedToken, URL
+from src.app.models import BlacklistedToken
 from src.app.core.config import Config
-
-passwd_context = CryptContext(
-    schemes=['bcrypt']
-)
+from src.app.core.codegen import get_code_generator
+from src.app.core.metrics import SHORT_CODES_GENERATED
+from src.app.core.cache import auth_cache
+from src.app.core.shared_cache import invalidation_bus
+from src.app.core.revocation import revocation_filter
+from src.app.core.hashing import hashing_pool, HashingPoolBusy
+from sqlalchemy.exc import IntegrityError
 
 ACCESS_TOKEN_EXPIRTY = 3600
 
-ALPHABET = string.ascii_letters + string.digits
-
-async def generate_short_code(session: AsyncSession, length: int = 8):
+def client_ip(request: Request) -> str:
     """
-    Generates a cryptographically secure and unique short code.
-    Checks the database if it already exists.
+    The visitor's address: the first hop of `CLIENT_IP_HEADER` when running behind a
+    proxy that sets it, else the peer address.
     """
 
-    while True:
-        code = ''.join(secrets.choice(ALPHABET) for _ in range(length))
+    if Config.CLIENT_IP_HEADER:
+        forwarded = request.headers.get(Config.CLIENT_IP_HEADER)
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+
+    return request.client.host if request.client else ""
 
-        result = await session.execute(select(URL).where(URL.short_code == code))
 
-        if not result.scalar_one_or_none():
-            return code
+async def generate_short_code():
+    """
+    Generates a short code with the strategy selected by `SHORT_CODE_STRATEGY`.
+    Uniqueness is not probed here: the unique index on urls.short_code rejects collisions
+    and `URLService.create_short_url` retries with a fresh code.
+    """
+
+    SHORT_CODES_GENERATED.inc()
 
+    return await get_code_generator().next_code()
 
-def hashpassword(password: str) -> str:
-    return passwd_context.hash(password)
 
-def verify_password(password: str, hashed_password: str) -> bool:
-    return passwd_context.verify(password, hashed_password)
+async def hashpassword(password: str) -> str:
+    """
+    Hashes on the bcrypt worker pool so the event loop keeps serving other requests.
+    """
+    try:
+        return await hashing_pool.hash(password)
+    except HashingPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again"
+        )
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    try:
+        return await hashing_pool.verify(password, hashed_password)
+    except HashingPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again"
+        )
 
 
 def create_access_token(user_data: dict, expiry: timedelta = None, refresh: bool=False):
@@ -90,7 +114,7 @@ def verify_access_token(token: str) -> dict:
 
 async def blacklist_token(token: str, session: AsyncSession):
     """
-    Adds token to blacklist table models.BlacklistedToken
+    Adds the token's jti to blacklist table models.BlacklistedToken
     Decodes tokens then blacklists it if token is valid
     """
 
@@ -101,36 +125,38 @@ async def blacklist_token(token: str, session: AsyncSession):
             algorithms=[Config.JWT_ALGORITHM]
         )
 
+        jti = payload["jti"]
         exp_timestamp = payload.get("exp")
         expires_at = datetime.fromtimestamp(exp_timestamp)
     except Exception:
         raise ValueError("Invalid token")
     
-    blacklist_token = BlacklistedToken(token=token, expires_at=expires_at)
+    blacklist_token = BlacklistedToken(jti=jti, expires_at=expires_at)
 
     session.add(blacklist_token)
-    await session.commit()
+    try:
+        await session.commit()
+    except IntegrityError:
+        #already revoked (e.g. logout called twice)
+        await session.rollback()
+
+    revocation_filter.add(jti)
+    auth_cache.invalidate(auth_cache.key_for(token))
+    await invalidation_bus.publish("revoked", [jti])
 
 
-async def is_token_blacklisted(token: str, session: AsyncSession):
+async def is_token_blacklisted(jti: str, session: AsyncSession):
     """
-    Returns blacklisted token from database.
-    This function helps the logout endpoint
+    Checks whether a token (by its jti) has been revoked.
+    The in-process revocation filter answers the common "not revoked" case;
+    only probable positives are confirmed against the database.
     """
 
-    statement = select(BlacklistedToken).where(BlacklistedToken.token == token)
+    if not revocation_filter.might_be_revoked(jti):
+        return False
+
+    statement = select(BlacklistedToken.id).where(BlacklistedToken.jti == jti)
 
     result = await session.execute(statement)
 
     return result.scalar_one_or_none() is not None
-
-async def delete_expired_tokens(session: AsyncSession):
-    """
-    Deletes expire token from models.BlacklistedToken (table)
-    Done with BackgroundTask to enable efficient flow
-    """
-    
-    now = datetime.now()
-    token = delete(BlacklistedToken).where(BlacklistedToken.expires_at < now)
-    await session.execute(token)
-    await session.commit()
\ No newline at end of file
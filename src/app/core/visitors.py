@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from datetime import date
+from sqlalchemy import bindparam, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select, update
+from src.app.models import VisitorSketch
+from src.app.core.hll import HyperLogLog
+from src.app.core.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class VisitorCounter:
+    """
+    Approximate unique visitors per (short_code, day).
+
+    Redirects call `record()`, which hashes the visitor into a HyperLogLog register
+    update kept in memory (sparse: only the registers that changed). A background task
+    merges the pending updates into `visitor_sketches` every `flush_interval` seconds;
+    rows are locked while merging so concurrent workers never overwrite each other.
+    """
+
+    def __init__(self, precision: int, flush_interval: float):
+        self.precision = precision
+        self.flush_interval = flush_interval
+
+        self._pending: dict[tuple, dict] = {}
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._engine = None
+
+        self.recorded = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def record(self, short_code: str, visitor: str) -> None:
+        index, rank = HyperLogLog.position(visitor, self.precision)
+
+        registers = self._pending.setdefault((short_code, date.today()), {})
+        if rank > registers.get(index, 0):
+            registers[index] = rank
+
+        self.recorded += 1
+
+    def _restore(self, pending: dict) -> None:
+        for key, registers in pending.items():
+            current = self._pending.setdefault(key, {})
+            for index, rank in registers.items():
+                if rank > current.get(index, 0):
+                    current[index] = rank
+
+    async def flush(self) -> int:
+        """
+        Merges every pending sketch into the database. Returns the number of sketches written.
+        """
+
+        if not self._pending or self._engine is None:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        #primary key order everywhere: workers flushing overlapping rows then lock them in the same order
+        keys = sorted(pending)
+
+        try:
+            async with self._engine.begin() as conn:
+                dialect_insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+                empty = bytes(1 << self.precision)
+
+                #make sure every row exists, so the merge below can lock it
+                await conn.execute(
+                    dialect_insert(VisitorSketch).on_conflict_do_nothing(index_elements=["short_code", "day"]),
+                    [{"short_code": short_code, "day": day, "registers": empty} for short_code, day in keys]
+                )
+
+                result = await conn.execute(
+                    select(VisitorSketch.short_code, VisitorSketch.day, VisitorSketch.registers)
+                    .where(tuple_(VisitorSketch.short_code, VisitorSketch.day).in_(keys))
+                    .order_by(VisitorSketch.short_code, VisitorSketch.day)
+                    .with_for_update()
+                )
+
+                params = []
+                for short_code, day, stored in result:
+                    sketch = HyperLogLog(self.precision, stored)
+                    for index, rank in pending[short_code, day].items():
+                        sketch.update(index, rank)
+                    params.append({"code": short_code, "bucket": day, "sketch": sketch.to_bytes()})
+
+                await conn.execute(
+                    update(VisitorSketch)
+                    .where(VisitorSketch.short_code == bindparam("code"))
+                    .where(VisitorSketch.day == bindparam("bucket"))
+                    .values(registers=bindparam("sketch")),
+                    params
+                )
+        except Exception:
+            logger.exception("Failed to flush %d visitor sketches", len(pending))
+            self.failed_flushes += 1
+            self._restore(pending)
+            return 0
+
+        self.flushes += 1
+        return len(keys)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            await self.flush()
+
+    def start(self, engine) -> None:
+        self._engine = engine
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            #asked to exit, not cancelled, so sketches being merged aren't lost
+            self._stopping.set()
+            await self._task
+            self._task = None
+            self._stopping.clear()
+
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "precision": self.precision,
+            "standard_error": round(HyperLogLog(self.precision).standard_error, 4),
+            "pending_sketches": len(self._pending),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes
+        }
+
+
+def merged_sketch(rows, precision: int) -> HyperLogLog:
+    """
+    Union of stored sketches, e.g. every day of a date range.
+    """
+
+    sketch = HyperLogLog(precision)
+    for registers in rows:
+        sketch.merge(HyperLogLog(precision, registers))
+
+    return sketch
+
+
+visitor_counter = VisitorCounter(
+    precision=Config.VISITOR_HLL_PRECISION,
+    flush_interval=Config.VISITOR_FLUSH_INTERVAL
+)
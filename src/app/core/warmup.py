@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_
+from sqlmodel import select
+from src.app.models import URL, ClickRollup
+from src.app.core.cache import ResolvedURL
+from src.app.core.shared_cache import redirect_tier
+from src.app.core.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer:
+    """
+    Prefetches the most clicked links into the redirect cache after startup.
+
+    - `source` is "click_count" (all-time `urls.click_count`) or "recent" (day rollups
+      of the last `recent_days` days).
+    - The top `limit` active, unexpired links are read in one streaming query and cached
+      `batch_size` rows at a time.
+    - It gives up after `time_budget` seconds; links cached by then stay cached.
+    """
+
+    def __init__(self, limit: int, time_budget: float, source: str, recent_days: int, batch_size: int = 1000):
+        self.limit = limit
+        self.time_budget = time_budget
+        self.source = source
+        self.recent_days = recent_days
+        self.batch_size = batch_size
+
+        self._task: asyncio.Task | None = None
+
+        self.state = "disabled" if limit <= 0 else "pending"
+        self.loaded = 0
+        self.seconds = 0.0
+
+    def statement(self, now: datetime):
+        columns = (URL.short_code, URL.original_url, URL.is_active, URL.expires_at)
+        live = (URL.is_active, or_(URL.expires_at.is_(None), URL.expires_at > now))
+
+        if self.source == "click_count":
+            return select(*columns).where(*live).order_by(URL.click_count.desc()).limit(self.limit)
+
+        if self.source == "recent":
+            recent = (
+                select(ClickRollup.short_code, func.sum(ClickRollup.clicks).label("clicks"))
+                .where(ClickRollup.granularity == "day")
+                .where(ClickRollup.bucket_start >= now - timedelta(days=self.recent_days))
+                .group_by(ClickRollup.short_code)
+                .subquery()
+            )
+            return (
+                select(*columns)
+                .join(recent, recent.c.short_code == URL.short_code)
+                .where(*live)
+                .order_by(recent.c.clicks.desc())
+                .limit(self.limit)
+            )
+
+        raise ValueError(f"Unknown WARMUP_SOURCE: {self.source}")
+
+    async def _load(self, engine) -> None:
+        statement = self.statement(datetime.now()).execution_options(yield_per=self.batch_size)
+
+        async with engine.connect() as conn:
+            result = await conn.stream(statement)
+
+            async for batch in result.partitions():
+                await redirect_tier.set_many([(row.short_code, ResolvedURL(*row)) for row in batch])
+                self.loaded += len(batch)
+
+    async def run(self, engine) -> None:
+        if self.limit <= 0:
+            return
+
+        self.state = "running"
+        started = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(self._load(engine), timeout=self.time_budget)
+            self.state = "done"
+        except asyncio.TimeoutError:
+            self.state = "timed_out"
+            logger.warning("Cache warm-up stopped after %.1fs with %d links cached", self.time_budget, self.loaded)
+        except Exception:
+            self.state = "failed"
+            logger.exception("Cache warm-up failed")
+        finally:
+            self.seconds = time.perf_counter() - started
+
+    @property
+    def ready(self) -> bool:
+        #a failed or cut short warm-up still leaves a working (just colder) worker
+        return self.state not in ("pending", "running")
+
+    def start(self, engine) -> None:
+        if self.limit > 0 and self._task is None:
+            self._task = asyncio.create_task(self.run(engine))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "source": self.source,
+            "limit": self.limit,
+            "loaded": self.loaded,
+            "progress": round(self.loaded / self.limit, 4) if self.limit > 0 else 1.0,
+            "seconds": round(self.seconds, 3),
+            "time_budget": self.time_budget
+        }
+
+
+cache_warmer = CacheWarmer(
+    limit=Config.WARMUP_LINKS,
+    time_budget=Config.WARMUP_TIME_BUDGET,
+    source=Config.WARMUP_SOURCE,
+    recent_days=Config.WARMUP_RECENT_DAYS
+)
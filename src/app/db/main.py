@@ -1,43 +1,284 @@
-from sqlmodel import create_engine, SQLModel
-from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy.orm import sessionmaker
+import time
+import logging
+from contextlib import asynccontextmanager
+from sqlmodel import SQLModel
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from src.app.core.config import Config
+from src.app.core.metrics import DB_POOL_WAIT_SECONDS, instrument_engine
 
 
-async_engine = AsyncEngine(
-    create_engine(
-        url=Config.DATABASE_URL
-    )
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that also records how long checkouts wait for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            DB_POOL_WAIT_SECONDS.observe(waited)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Pool settings from `Settings`. SQLite (used for local benchmarks) keeps SQLAlchemy's
+    default pool since it doesn't support the queue pool arguments for in-memory databases.
+    """
+
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING
+    }
+
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE}
+
+    return options
+
+
+async_engine = create_async_engine(
+    Config.DATABASE_URL,
+    **engine_options(Config.DATABASE_URL)
 )
 
+instrument_engine(async_engine.sync_engine)
+
+async_session_maker = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+class ReplicaRouter:
+    """
+    Picks a read replica for read-only sessions.
+
+    - `strategy` is "round_robin" or "least_busy" (fewest checked-out connections).
+    - A replica that fails to hand out a connection is skipped for `retry_after` seconds.
+    - With no replica available, reads fall back to the primary.
+    """
+
+    def __init__(self, urls: list[str], strategy: str, retry_after: float):
+        self.strategy = strategy
+        self.retry_after = retry_after
+
+        self.engines = [create_async_engine(url, **engine_options(url)) for url in urls]
+        for engine in self.engines:
+            instrument_engine(engine.sync_engine)
+        self.session_makers = [
+            async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, info={"replica": True})
+            for engine in self.engines
+        ]
+
+        self._next = 0
+        self._down_until = [0.0] * len(self.engines)
+
+        self.reads = [0] * len(self.engines)
+        self.failures = [0] * len(self.engines)
+        self.primary_fallbacks = 0
+
+    def candidates(self) -> list[int]:
+        now = time.monotonic()
+        healthy = [i for i in range(len(self.engines)) if self._down_until[i] <= now]
+
+        if self.strategy == "least_busy":
+            return sorted(healthy, key=lambda i: getattr(self.engines[i].pool, "checkedout", lambda: 0)())
+
+        start = self._next % len(self.engines) if self.engines else 0
+        self._next += 1
+        return [i for i in healthy if i >= start] + [i for i in healthy if i < start]
+
+    def mark_down(self, index: int) -> None:
+        self.failures[index] += 1
+        self._down_until[index] = time.monotonic() + self.retry_after
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "replica": index,
+                "healthy": self._down_until[index] <= now,
+                "reads": self.reads[index],
+                "failures": self.failures[index],
+                **pool_stats(engine)
+            }
+            for index, engine in enumerate(self.engines)
+        ]
+
+
+def alembic_head_revisions() -> set[str]:
+    """
+    Head revision(s) of the Alembic migration scripts (alembic is only imported here).
+    """
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(AlembicConfig(Config.ALEMBIC_CONFIG)).get_heads())
+
+
+async def verify_schema_revision(engine=async_engine) -> None:
+    """
+    Refuses to start against a database that isn't migrated to the Alembic head.
+    """
+
+    heads = alembic_head_revisions()
+
+    try:
+        async with engine.connect() as conn:
+            current = set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+    except DBAPIError as exc:
+        raise RuntimeError("Database schema is not managed by Alembic (no alembic_version table)") from exc
+
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema is at revision {sorted(current)}, expected {sorted(heads)}; run `alembic upgrade head`"
+        )
+
 
 async def init_db() -> None:
     """
-    This async function is for automatically creating table and pushing to postgress 
-    at the start of the engine.
+    This async function prepares the schema at the start of the engine, per `DB_INIT_MODE`:
 
-    Note: this does not push new tables (thats the work of alembic)
+    - "create_all": creates missing tables from the models (does not alter existing ones, thats the work of alembic)
+    - "skip": nothing, the schema is owned by alembic migrations
+    - "verify": no DDL either, but startup fails unless the database is at the alembic head revision
     """
-    async with async_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+
+    if Config.DB_INIT_MODE == "skip":
+        return
+
+    if Config.DB_INIT_MODE == "verify":
+        await verify_schema_revision()
+        return
+
+    if Config.DB_INIT_MODE == "create_all":
+        async with async_engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        return
+
+    raise ValueError(f"Unknown DB_INIT_MODE: {Config.DB_INIT_MODE}")
 
 
 async def get_session():
     """
     This is an async generator function that creates and provides a database session.
 
-    - It uses SQLAlchemy's `sessionmaker` to create a session factory bound to an async database engine.
+    - Sessions come from the module-level `async_session_maker`, built once at import.
     - `AsyncSession` is used to enable asynchronous DB operations.
     - `expire_on_commit=False` means data won't be cleared from the session after committing.
-    - `async with Session() as session` ensures the session is properly opened and closed.
+    - `async with async_session_maker() as session` ensures the session is properly opened and closed.
     - `yield session` allows other parts of your app (like FastAPI routes) to use this session for DB operations.
     """
-    Session = sessionmaker(
-        bind=async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
+    async with async_session_maker() as session:
+        yield session
+
+
+@asynccontextmanager
+async def read_session():
+    """
+    Session for read-only work: a healthy replica if one is configured, else the primary.
+    A connection is checked out up front so a dead replica is detected (and skipped)
+    before any query runs, so only open one where a query is certain: the redirect path
+    opens its own on a cache miss (see `URLService.resolve_short_code`).
+    """
+
+    for index in replica_router.candidates():
+        session = replica_router.session_makers[index]()
+        try:
+            await session.connection()
+        except Exception:
+            logger.warning("Read replica %d unavailable, trying the next one", index, exc_info=True)
+            await session.close()
+            replica_router.mark_down(index)
+            continue
+
+        replica_router.reads[index] += 1
+        async with session:
+            yield session
+        return
 
-    async with Session() as session:
-        yield session
\ No newline at end of file
+    if replica_router.engines:
+        replica_router.primary_fallbacks += 1
+
+    async with async_session_maker() as session:
+        yield session
+
+
+async def get_read_session():
+    """
+    Same as `get_session` but routed to a read replica (see `read_session`).
+    Only for dependencies that never write: redirects, listings, single lookups.
+    """
+    async with read_session() as session:
+        yield session
+
+
+def is_replica_session(session) -> bool:
+    return session.info.get("replica") is True
+
+
+def pool_stats(engine=async_engine) -> dict:
+    """
+    Connection pool counters for monitoring (checked out, overflow, checkout wait time).
+    """
+
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow()
+        })
+
+    if isinstance(pool, InstrumentedPool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "avg_wait_ms": round(pool.wait_seconds / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "max_wait_ms": round(pool.max_wait_seconds * 1000, 3)
+        })
+
+    return stats
+
+
+replica_router = ReplicaRouter(
+    urls=[url.strip() for url in Config.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    strategy=Config.DB_REPLICA_STRATEGY,
+    retry_after=Config.DB_REPLICA_RETRY_AFTER
+)
@@ -1,10 +1,14 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import String, Integer, DateTime, Column, ForeignKey
-from datetime import datetime
+from sqlalchemy import String, Integer, BigInteger, DateTime, Date, LargeBinary, Column, ForeignKey, Index, text
+from datetime import datetime, date
 from typing import List, Optional
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        #keyset pagination order for /users
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id: int = Field(primary_key=True, nullable=False)
     first_name: str = Field(sa_column=Column(String(100), nullable=False))
@@ -14,13 +18,20 @@ class User(SQLModel, table=True):
     hashed_password: str = Field(sa_column=Column(String(255), nullable=False), exclude=True)
     created_at: datetime = Field(sa_column=Column(DateTime, default=datetime.now))
 
-    url: List["URL"] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy": "selectin"})
+    #never loaded implicitly: queries that need a user's URLs must opt in with selectinload(User.url)
+    url: List["URL"] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy": "raise"})
 
     def __repr__(self):
         return f"<User ID={self.id}, username={self.username}, email_address={self.email_address}>"
 
 class URL(SQLModel, table=True):
     __tablename__ = "urls"
+    __table_args__ = (
+        #keyset pagination order for a user's links (/urls/me)
+        Index("ix_urls_user_id_created_at_id", "user_id", "created_at", "id"),
+        #partial index: the maintenance worker only ever looks for active links past expiry
+        Index("ix_urls_active_expires_at", "expires_at", postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
 
     id: int = Field(sa_column=Column(Integer, primary_key=True, nullable=False))
     original_url: str = Field(sa_column=Column(String(255), nullable=False))
@@ -31,12 +42,63 @@ class URL(SQLModel, table=True):
     click_count: int = Field(sa_column=Column(Integer, default=0))
     is_active: bool = True
 
-    user: Optional["User"] = Relationship(back_populates="url", sa_relationship_kwargs={"lazy": "selectin"})
+    #never loaded implicitly: queries that need the owner must opt in with selectinload(URL.user)
+    user: Optional["User"] = Relationship(back_populates="url", sa_relationship_kwargs={"lazy": "raise"})
     
 
 class BlacklistedToken(SQLModel, table=True):
     __tablename__ = "blacklistedtokens"
+    __table_args__ = (
+        Index("ix_blacklistedtokens_expires_at", "expires_at"),
+        #the revocation filter re-reads recent revocations by time, not by id
+        Index("ix_blacklistedtokens_revoked_at", "revoked_at"),
+    )
 
     id: int = Field(sa_column=Column(Integer, primary_key=True, nullable=False))
-    token: str = Field(sa_column=Column(String, index=True, unique=True))
-    expires_at: datetime
\ No newline at end of file
+    jti: str = Field(sa_column=Column(String(36), index=True, unique=True))
+    expires_at: datetime
+    revoked_at: datetime = Field(sa_column=Column(DateTime, nullable=False, default=datetime.now))
+
+
+class ShortCodeBlock(SQLModel, table=True):
+    __tablename__ = "short_code_blocks"
+
+    name: str = Field(sa_column=Column(String(50), primary_key=True, nullable=False))
+    next_value: int = Field(sa_column=Column(BigInteger, nullable=False, default=0))
+
+
+class ClickEvent(SQLModel, table=True):
+    __tablename__ = "click_events"
+    __table_args__ = (
+        Index("ix_click_events_short_code_clicked_at", "short_code", "clicked_at"),
+    )
+
+    id: int = Field(sa_column=Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, nullable=False))
+    short_code: str = Field(sa_column=Column(String(10), nullable=False))
+    clicked_at: datetime = Field(sa_column=Column(DateTime, nullable=False))
+    referrer: Optional[str] = Field(default=None, sa_column=Column(String(255), nullable=True))
+    user_agent_family: str = Field(sa_column=Column(String(20), nullable=False))
+    country: Optional[str] = Field(default=None, sa_column=Column(String(2), nullable=True))
+
+
+class ClickRollup(SQLModel, table=True):
+    """
+    Pre-aggregated click counts per short code and minute/hour/day bucket.
+    """
+    __tablename__ = "click_rollups"
+
+    short_code: str = Field(sa_column=Column(String(10), primary_key=True, nullable=False))
+    granularity: str = Field(sa_column=Column(String(6), primary_key=True, nullable=False))
+    bucket_start: datetime = Field(sa_column=Column(DateTime, primary_key=True, nullable=False))
+    clicks: int = Field(sa_column=Column(BigInteger, nullable=False, default=0))
+
+
+class VisitorSketch(SQLModel, table=True):
+    """
+    HyperLogLog registers of the visitors of a short code on one day (see `core.hll`).
+    """
+    __tablename__ = "visitor_sketches"
+
+    short_code: str = Field(sa_column=Column(String(10), primary_key=True, nullable=False))
+    day: date = Field(sa_column=Column(Date, primary_key=True, nullable=False))
+    registers: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, field_validator, AnyHttpUrl, Field
 from typing import Optional, List
 from datetime import datetime
+from src.app.core.config import Config
 
 
 class UserBase(BaseModel):
@@ -39,12 +40,31 @@ class User(UserBase):
         from_attributes=True
 
 
+#urls.short_code is a String(10)
+SHORT_CODE_MIN_LENGTH = 3
+SHORT_CODE_MAX_LENGTH = 10
+
+
 class URLBase(BaseModel):
     original_url: AnyHttpUrl
-    short_code: Optional[str] = Field(default=None, min_length=3, max_length=20, description="Shortcode (can also be autogenerated)")
+    short_code: Optional[str] = Field(default=None, min_length=SHORT_CODE_MIN_LENGTH, max_length=SHORT_CODE_MAX_LENGTH, description="Shortcode (can also be autogenerated)")
 
 class URLCreate(URLBase):
-    pass
+
+    @field_validator('short_code')
+    def validate_short_code(cls, value):
+        #`GET /{short_code}` sits next to the app's own top-level routes
+        reserved = {code.strip().lower() for code in Config.RESERVED_SHORT_CODES.split(",")}
+        if value is not None and value.lower() in reserved:
+            raise ValueError('This short code is reserved')
+        return value
+
+    @field_validator('original_url')
+    def validate_original_url(cls, value):
+        #urls.original_url is a String(255)
+        if len(str(value)) > 255:
+            raise ValueError('URL must be at most 255 characters long')
+        return value
 
 class URLRead(URLBase):
     id: int
@@ -57,6 +77,33 @@ class URLRead(URLBase):
     class ConfigDict:
         from_attributes = True
 
+class BulkURLItemResult(BaseModel):
+    index: int
+    status: str = Field(description="created, conflict, invalid or skipped")
+    short_code: Optional[str] = None
+    url: Optional[URLRead] = None
+    detail: Optional[str] = None
+
+class BulkURLResult(BaseModel):
+    created: int
+    failed: int
+    truncated: bool = Field(default=False, description="the upload went over the item limit and was not read to the end")
+    results: List[BulkURLItemResult]
+
 class LoginData(BaseModel):
     username: str
-    password: str
\ No newline at end of file
+    password: str
+
+class ClickBucket(BaseModel):
+    bucket_start: datetime
+    clicks: int
+    unique_visitors: Optional[int] = Field(default=None, description="approximate, day granularity only")
+
+class ClickStats(BaseModel):
+    short_code: str
+    total_clicks: int
+    granularity: str
+    since: datetime
+    until: datetime
+    unique_visitors: int = Field(description="approximate (HyperLogLog), over the days of the range")
+    buckets: List[ClickBucket]
@@ -1,10 +1,30 @@
 from sqlalchemy.ext.asyncio.session import AsyncSession
-from sqlmodel import select, desc
+from sqlmodel import select, update, delete, desc, insert, or_, and_
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from typing import List, AsyncIterator
 from src.app.schemas import UserCreate, UserUpdate, URLCreate
-from src.app.models import User, URL
+from src.app.models import User, URL, ClickRollup, VisitorSketch
 from src.app.core.utils import hashpassword, generate_short_code
+from src.app.core.cache import ResolvedURL, NOT_FOUND
+from src.app.core.shared_cache import redirect_tier, invalidate_user
+from src.app.core.clicks import click_aggregator, click_event_writer
+from src.app.core.visitors import visitor_counter, merged_sketch
+from src.app.core.config import Config
+from src.app.core.metrics import SHORT_CODE_RETRIES
+from src.app.core.pagination import page_with_cursor
+from src.app.db.main import async_session_maker, read_session, is_replica_session
 from datetime import datetime, timedelta
 
+#the fields of schemas.User / schemas.URLRead, in their order, for listings that skip the ORM
+USER_READ_COLUMNS = (User.first_name, User.last_name, User.username, User.email_address, User.id, User.created_at)
+URL_READ_COLUMNS = (
+    URL.original_url, URL.short_code, URL.id, URL.user_id,
+    URL.created_at, URL.click_count, URL.is_active, URL.expires_at
+)
+
+
 class UserService:
 
 
@@ -16,23 +36,31 @@ class UserService:
             **user_dict
         )
 
-        new_user.hashed_password = hashpassword(user_dict['hashed_password'])
+        new_user.hashed_password = await hashpassword(user_dict['hashed_password'])
 
         session.add(new_user)
 
         await session.commit()
 
-        session.refresh(new_user)
+        await session.refresh(new_user)
 
         return new_user
     
-    async def get_users(self, skip: int, limit: int, session: AsyncSession):
+    async def get_users(self, cursor: tuple | None, limit: int, session: AsyncSession):
+        """
+        Keyset pagination on (created_at, id), newest first.
+        Returns the page and the cursor of the next page (None on the last page).
+        """
 
-        statement = select(User).order_by(desc(User.created_at)).offset(skip).limit(limit)
+        statement = select(*USER_READ_COLUMNS).order_by(desc(User.created_at), desc(User.id)).limit(limit + 1)
+
+        if cursor is not None:
+            statement = statement.where(tuple_(User.created_at, User.id) < tuple_(*cursor))
 
         result = await session.execute(statement)
+        users, next_cursor = page_with_cursor(result.all(), limit)
 
-        return result.scalars().all()
+        return [user._asdict() for user in users], next_cursor
 
     async def get_user_by_email(self, user_email, session: AsyncSession):
 
@@ -78,6 +106,9 @@ class UserService:
 
             await session.commit()
 
+            #cached slim user records for this user's tokens are now stale
+            await invalidate_user(user_id)
+
             return user_to_update
         else:
             return None
@@ -85,73 +116,366 @@ class UserService:
     
     async def delete_user(self, user_id: int, session: AsyncSession):
 
-        user_to_delete = await self.get_user(user_id, session)
+        #the user's URLs are kept but detached in one UPDATE, however many there are
+        await session.execute(update(URL).where(URL.user_id == user_id).values(user_id=None))
 
-        if user_to_delete is not None:
+        result = await session.execute(delete(User).where(User.id == user_id))
 
-            await session.delete(user_to_delete)
+        if result.rowcount:
 
             await session.commit()
+
+            await invalidate_user(user_id)
         
         else:
+            await session.rollback()
             return None
 
 
 class URLService:
 
-    async def existing_short_code(self, code: str, session: AsyncSession):
+    async def lookup_short_code(self, code: str, session: AsyncSession):
+        """
+        Lean lookup for the redirect path.
+        Selects only the columns a redirect needs and returns a plain row (no ORM entity,
+        no relationship loading), so the cost is one row whatever the owner's link count.
+        """
 
-        statement = select(URL).where(URL.short_code == code)
+        statement = select(
+            URL.short_code,
+            URL.original_url,
+            URL.is_active,
+            URL.expires_at
+        ).where(URL.short_code == code)
 
         result = await session.execute(statement)
 
-        return result.scalar_one_or_none()
+        return result.one_or_none()
+
+    async def resolve_short_code(self, code: str) -> ResolvedURL | None:
+        """
+        Resolves a short code for the redirect path.
+        Answers from the redirect cache (in-process, then the shared tier) when possible
+        and only falls back to `lookup_short_code` on a miss. Unknown codes are cached too (negative caching)
+        with a shorter TTL so a typo'd link can't hammer the database.
+
+        Concurrent misses for one code share a single lookup, and entries close to expiry are
+        refreshed in the background (see `TwoTierCache.get_or_load`).
+        A session is only opened (see `read_session`) on a cache miss.
+        """
+
+        async def load():
+            async with read_session() as session:
+                return await self._resolve_uncached(code, session)
+
+        #a shared lookup can outlive the request that started it, so it never borrows a request's session
+        resolved = await redirect_tier.get_or_load(code, load)
+
+        return None if resolved is NOT_FOUND else resolved
+
+    async def _resolve_uncached(self, code: str, session: AsyncSession) -> ResolvedURL | object:
+
+        row = await self.lookup_short_code(code, session)
+
+        #a replica may not have caught up with a link created a moment ago, confirm on the primary
+        if row is None and is_replica_session(session):
+            async with async_session_maker() as primary:
+                row = await self.lookup_short_code(code, primary)
+
+        return ResolvedURL(**row._mapping) if row is not None else NOT_FOUND
     
-    async def get_urls(self, current_user: int, session: AsyncSession):
-        statement = select(URL).where(URL.user_id == current_user).order_by(desc(URL.created_at))
+    async def get_urls(
+        self,
+        current_user: int,
+        session: AsyncSession,
+        cursor: tuple | None = None,
+        limit: int = 50,
+        active: bool | None = None,
+        expired: bool | None = None,
+        prefix: str | None = None
+    ):
+        """
+        A user's links, newest first, with keyset pagination on (created_at, id).
+        Filters are applied in SQL. Returns the page (plain dicts of the `URLRead` columns,
+        no ORM entities) and the cursor of the next page.
+        """
+
+        statement = (
+            select(*URL_READ_COLUMNS)
+            .where(URL.user_id == current_user)
+            .order_by(desc(URL.created_at), desc(URL.id))
+            .limit(limit + 1)
+        )
+
+        if cursor is not None:
+            statement = statement.where(tuple_(URL.created_at, URL.id) < tuple_(*cursor))
+
+        if active is not None:
+            statement = statement.where(URL.is_active == active)
+
+        if expired is not None:
+            now = datetime.now()
+            if expired:
+                statement = statement.where(and_(URL.expires_at.is_not(None), URL.expires_at < now))
+            else:
+                statement = statement.where(or_(URL.expires_at.is_(None), URL.expires_at >= now))
+
+        if prefix:
+            statement = statement.where(URL.short_code.startswith(prefix, autoescape=True))
 
         result = await session.execute(statement)
+        urls, next_cursor = page_with_cursor(result.all(), limit)
+
+        return [url._asdict() for url in urls], next_cursor
+
+    async def stream_urls(self, user_id: int, session: AsyncSession) -> AsyncIterator[list]:
+        """
+        Yields a user's links in batches of `EXPORT_BATCH_SIZE` plain rows, read through a
+        server-side cursor, so memory use doesn't depend on how many links the user has.
+        """
+
+        statement = (
+            select(
+                URL.id,
+                URL.short_code,
+                URL.original_url,
+                URL.created_at,
+                URL.expires_at,
+                URL.click_count,
+                URL.is_active
+            )
+            .where(URL.user_id == user_id)
+            .order_by(URL.id)
+            .execution_options(yield_per=Config.EXPORT_BATCH_SIZE)
+        )
 
-        return result.scalars().all()
+        result = await session.stream(statement)
 
-    async def create_short_url(self, url_data: URLCreate, current_user: User, session: AsyncSession) -> str:
-        EXPIRY = 2
-        url_expiry = datetime.now() + timedelta(days=EXPIRY)
+        async for batch in result.mappings().partitions():
+            yield batch
 
-        if url_data.short_code:
-            existing = await self.existing_short_code(url_data.short_code, session)
-            if existing:
+    async def create_short_url(self, url_data: URLCreate, current_user: User, session: AsyncSession) -> URL | None:
+        """
+        Creates a link with a single `INSERT ... ON CONFLICT (short_code) DO NOTHING RETURNING ...`
+        (see `insert_urls_ignoring_conflicts`), so the common case is one round trip and there is
+        no window between checking a code and inserting it.
+
+        Returns None when a custom short code is taken; a generated one that collides is re-drawn.
+        """
+
+        EXPIRY = 2
+        now = datetime.now()
+        url_expiry = now + timedelta(days=EXPIRY)
+
+        for _ in range(Config.SHORT_CODE_MAX_RETRIES):
+            short_code = url_data.short_code or await generate_short_code()
+
+            row = {
+                "original_url": str(url_data.original_url),
+                "short_code": short_code,
+                "user_id": current_user.id,
+                "created_at": now,
+                "expires_at": url_expiry,
+                "click_count": 0,
+                "is_active": True
+            }
+
+            inserted = await self.insert_urls_ignoring_conflicts([row], session)
+            if inserted:
+                break
+
+            if url_data.short_code:
                 return None
-            
-            short_code = url_data.short_code
-        
+
+            SHORT_CODE_RETRIES.inc()
         else:
-            short_code = await generate_short_code(session)
-        
-        new_url = URL(
-            original_url=str(url_data.original_url),
-            short_code=short_code,
-            user_id=current_user.id,
-            expires_at=url_expiry
-        )
-        
-        session.add(new_url)
+            raise RuntimeError("Could not allocate a unique short code")
+
         await session.commit()
-        await session.refresh(new_url)
+
+        new_url = URL(**inserted[0])
+
+        #primes the redirect cache, replacing any negative entry left by an earlier lookup here or on other workers
+        await redirect_tier.replace_many([(short_code, ResolvedURL(short_code, new_url.original_url, new_url.is_active, new_url.expires_at))])
 
         return new_url
-    
-    async def redirect_url(self, short_code: str, session: AsyncSession):
 
-        url = await self.existing_short_code(short_code, session)
+    async def insert_urls_ignoring_conflicts(self, rows: List[dict], session: AsyncSession) -> List[dict]:
+        """
+        Inserts URL rows in a single `INSERT ... ON CONFLICT (short_code) DO NOTHING RETURNING ...`
+        and returns the rows that were actually inserted.
+        Dialects without ON CONFLICT fall back to one savepoint per row.
+        """
+
+        dialect = session.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+            statement = (
+                dialect_insert(URL)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["short_code"])
+                .returning(*URL.__table__.columns)
+            )
+            result = await session.execute(statement)
 
-        #tracks how many times the link will be clicked
-        url.click_count += 1
+            return [dict(row) for row in result.mappings()]
+
+        inserted = []
+        for row in rows:
+            try:
+                async with session.begin_nested():
+                    result = await session.execute(insert(URL).values(row).returning(*URL.__table__.columns))
+                inserted.append(dict(result.mappings().one()))
+            except IntegrityError:
+                continue
+
+        return inserted
+
+    async def create_short_urls_bulk(self, urls_data: List[URLCreate], current_user: User, session: AsyncSession) -> List[tuple]:
+        """
+        Shortens a batch of URLs with multi-row inserts and reports every item separately.
+
+        Returns one `(status, row)` per input, in order: ("created", row) or ("conflict", None)
+        when a custom short code is already taken (or repeated within the batch).
+        Generated codes that collide are re-drawn instead of being reported.
+        """
+
+        EXPIRY = 2
+        now = datetime.now()
+        url_expiry = now + timedelta(days=EXPIRY)
+        user_id = current_user.id
+
+        outcomes: List[tuple] = [None] * len(urls_data)
+        pending = {}
+        seen_custom = set()
+
+        for index, url_data in enumerate(urls_data):
+            if url_data.short_code:
+                if url_data.short_code in seen_custom:
+                    outcomes[index] = ("conflict", None)
+                    continue
+                seen_custom.add(url_data.short_code)
+            pending[index] = url_data.short_code
+
+        for _ in range(Config.SHORT_CODE_MAX_RETRIES):
+            if not pending:
+                break
+
+            codes = {}
+            for index, custom_code in pending.items():
+                codes[index] = custom_code or await generate_short_code()
+
+            rows = [
+                {
+                    "original_url": str(urls_data[index].original_url),
+                    "short_code": code,
+                    "user_id": user_id,
+                    "created_at": now,
+                    "expires_at": url_expiry,
+                    "click_count": 0,
+                    "is_active": True
+                }
+                for index, code in codes.items()
+            ]
+
+            inserted = {row["short_code"]: row for row in await self.insert_urls_ignoring_conflicts(rows, session)}
+
+            retry = {}
+            for index, code in codes.items():
+                if code in inserted:
+                    row = inserted.pop(code)
+                    outcomes[index] = ("created", row)
+                elif pending[index]:
+                    outcomes[index] = ("conflict", None)
+                else:
+                    retry[index] = None
+
+            if retry:
+                SHORT_CODE_RETRIES.inc(amount=len(retry))
+            pending = retry
 
-        session.add(url)
         await session.commit()
 
-        return url
+        for index in pending:
+            outcomes[index] = ("conflict", None)
+
+        #primes the redirect cache once the rows are committed (and drops negative entries elsewhere)
+        await redirect_tier.replace_many([
+            (row["short_code"], ResolvedURL(row["short_code"], row["original_url"], row["is_active"], row["expires_at"]))
+            for outcome, row in outcomes
+            if outcome == "created"
+        ])
+
+        return outcomes
+    
+    async def redirect_url(
+        self,
+        short_code: str,
+        referrer: str | None = None,
+        user_agent: str | None = None,
+        country: str | None = None,
+        visitor: str | None = None
+    ):
+
+        #tracks how many times the link will be clicked (flushed in batches by the click aggregator)
+        click_aggregator.record(short_code)
+
+        #per-click history for analytics, written in the background by the click event writer
+        click_event_writer.record(short_code, referrer, user_agent, country)
+
+        #unique visitors per day, counted with a HyperLogLog sketch (the visitor key itself is never stored)
+        if visitor:
+            visitor_counter.record(short_code, visitor)
+
+    async def get_click_stats(self, short_code: str, user_id: int, granularity: str, since: datetime, until: datetime, session: AsyncSession):
+        """
+        Click series of one of the user's links from the pre-aggregated rollups
+        (one row per bucket, never the raw events). Returns None if the link isn't theirs.
+        """
+
+        link = (await session.execute(
+            select(URL.user_id, URL.click_count).where(URL.short_code == short_code)
+        )).one_or_none()
+
+        if link is None or link.user_id != user_id:
+            return None
+
+        statement = (
+            select(ClickRollup.bucket_start, ClickRollup.clicks)
+            .where(ClickRollup.short_code == short_code)
+            .where(ClickRollup.granularity == granularity)
+            .where(ClickRollup.bucket_start >= since)
+            .where(ClickRollup.bucket_start < until)
+            .order_by(ClickRollup.bucket_start)
+        )
+        buckets = [dict(row) for row in (await session.execute(statement)).mappings()]
+
+        sketches = (await session.execute(
+            select(VisitorSketch.day, VisitorSketch.registers)
+            .where(VisitorSketch.short_code == short_code)
+            .where(VisitorSketch.day >= since.date())
+            .where(VisitorSketch.day <= until.date())
+        )).all()
+
+        #daily sketches merge losslessly, so a range is the union of its days
+        unique_visitors = merged_sketch((row.registers for row in sketches), visitor_counter.precision).count()
+
+        if granularity == "day":
+            daily = {row.day: merged_sketch([row.registers], visitor_counter.precision).count() for row in sketches}
+            for bucket in buckets:
+                bucket["unique_visitors"] = daily.get(bucket["bucket_start"].date(), 0)
+
+        return {
+            "short_code": short_code,
+            "total_clicks": link.click_count or 0,
+            "granularity": granularity,
+            "since": since,
+            "until": until,
+            "unique_visitors": unique_visitors,
+            "buckets": buckets
+        }
 
 
 
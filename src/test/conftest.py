@@ -1,8 +1,20 @@
+import asyncio
 import pytest
+from contextlib import contextmanager
+from datetime import datetime
 from unittest.mock import AsyncMock, Mock
 from fastapi.testclient import TestClient
-from src.app.db.main import get_session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+from src.app.db import main as db_main
+from src.app.db.main import get_session, get_read_session
 from src.app.core.dependencies import get_current_user
+from src.app.core.metrics import count_queries, instrument_engine
+from src.app.core.cache import redirect_cache
+from src.app.models import User
+from src.app import services
 from src import app
 
 FAKE_USER_ID = 1
@@ -29,5 +41,78 @@ def fake_session():
 @pytest.fixture
 def testclient():
     app.dependency_overrides[get_session] = get_mock_session
+    app.dependency_overrides[get_read_session] = get_mock_session
     app.dependency_overrides[get_current_user] = get_current_user_id
     return TestClient(app)
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    """
+    A throwaway SQLite database (needs aiosqlite) wired in place of Postgres, with
+    `FAKE_USER_ID` already created. NullPool because TestClient runs every request
+    on its own event loop.
+    """
+
+    pytest.importorskip("aiosqlite")
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    instrument_engine(engine.sync_engine)
+    session_maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.execute(User.__table__.insert().values(
+                id=FAKE_USER_ID,
+                first_name="test",
+                last_name="user",
+                username="testuser",
+                email_address="testuser@test.local",
+                hashed_password="not-a-real-hash",
+                created_at=datetime.now()
+            ))
+
+    asyncio.run(setup())
+
+    monkeypatch.setattr(db_main, "async_session_maker", session_maker)
+    monkeypatch.setattr(services, "async_session_maker", session_maker)
+    redirect_cache.clear()
+
+    yield engine
+
+    redirect_cache.clear()
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def db_client(db_engine, monkeypatch):
+    """
+    TestClient running the real services against `db_engine` (only auth is faked).
+    """
+
+    monkeypatch.setattr(app, "dependency_overrides", {get_current_user: get_current_user_id})
+    return TestClient(app)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    `with query_budget(1): client.get(...)` fails if the block runs more than the
+    given number of statements, listing them (repeats first) to spot N+1 patterns.
+    """
+
+    @contextmanager
+    def budget(max_queries: int):
+        with count_queries() as stats:
+            yield stats
+
+        if stats.queries > max_queries:
+            repeated = stats.repeated()
+            ran = sorted(stats.statements, key=lambda statement: -repeated.get(statement, 1))
+            pytest.fail(
+                f"{stats.queries} queries, budget is {max_queries}:\n" + "\n".join(f"  {statement}" for statement in ran),
+                pytrace=False
+            )
+
+    return budget
@@ -96,7 +96,7 @@ async def test_login_success(fake_session, testclient, monkeypatch):
     mock_service.get_username = AsyncMock(return_value=fake_user)
 
     monkeypatch.setattr(auth_module, "user_services", mock_service)
-    monkeypatch.setattr(auth_module, "verify_password", lambda p, h: True)
+    monkeypatch.setattr(auth_module, "verify_password", AsyncMock(return_value=True))
     monkeypatch.setattr(auth_module, "create_access_token", lambda user_data, refresh=False, expiry=None: "fake_token_" + ("refresh" if refresh else "access"))
 
     payload = {
@@ -120,7 +120,7 @@ async def test_login_invalid_info(fake_session, testclient, monkeypatch):
     mock_service.get_username = AsyncMock(return_value=None)
 
     monkeypatch.setattr(auth_module, "user_services", mock_service)
-    monkeypatch.setattr(auth_module, "verify_password", lambda p, h: True)
+    monkeypatch.setattr(auth_module, "verify_password", AsyncMock(return_value=True))
     monkeypatch.setattr(auth_module, "create_access_token", lambda user_data, refresh=False, expiry=None: "fake_token_" + ("refresh" if refresh else "access"))
 
     payload = {
@@ -138,10 +138,8 @@ async def test_login_invalid_info(fake_session, testclient, monkeypatch):
 @pytest.mark.asyncio
 async def test_logout_success(monkeypatch, testclient):
     mock_blacklist_token = AsyncMock()
-    mock_delete_expired_tokens = Mock()
 
     monkeypatch.setattr(auth_module, "blacklist_token", mock_blacklist_token)
-    monkeypatch.setattr(auth_module, "delete_expired_tokens", mock_delete_expired_tokens)
 
     token = "valid.jwt.token"
 
@@ -157,7 +155,6 @@ async def test_logout_invalid_token(monkeypatch, testclient):
         raise ValueError("Invalid token")
 
     monkeypatch.setattr(auth_module, "blacklist_token", raise_value_error)
-    monkeypatch.setattr(auth_module, "delete_expired_tokens", Mock())
 
     token = "invalid.jwt.token"
 
@@ -0,0 +1,134 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.app.core.cache import TTLCache, AuthCache, AuthEntry, redirect_cache, auth_cache
+from src.app.services import URLService
+
+
+@pytest.fixture(autouse=True)
+def clear_redirect_cache():
+    redirect_cache.clear()
+    yield
+    redirect_cache.clear()
+
+
+def test_ttl_cache_evicts_least_recently_used():
+
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expires_entries():
+
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=-1)
+
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_resolve_short_code_caches_hits():
+
+    row = Mock()
+    row._mapping = {
+        "short_code": "ABC123",
+        "original_url": "https://google.com/",
+        "is_active": True,
+        "expires_at": None
+    }
+
+    service = URLService()
+    service.lookup_short_code = AsyncMock(return_value=row)
+
+    first = await service.resolve_short_code("ABC123")
+    second = await service.resolve_short_code("ABC123")
+
+    assert first == second
+    assert second.original_url == "https://google.com/"
+    service.lookup_short_code.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_resolve_short_code_caches_unknown_codes():
+
+    service = URLService()
+    service.lookup_short_code = AsyncMock(return_value=None)
+
+    assert await service.resolve_short_code("nope") is None
+    assert await service.resolve_short_code("nope") is None
+
+    service.lookup_short_code.assert_awaited_once()
+
+
+def test_cache_stats_endpoint(testclient):
+
+    response = testclient.get("/api/v1/monitoring/cache")
+
+    assert response.status_code == 200
+    assert "hits" in response.json()["redirect"]
+
+
+def make_claims(jti, user_id, ttl=3600):
+    return {
+        "jti": jti,
+        "exp": time.time() + ttl,
+        "user": {"user_id": user_id, "email": f"user{user_id}@gmail.com"}
+    }
+
+
+def test_auth_cache_entries_expire_with_the_token():
+
+    cache = AuthCache(maxsize=10, max_ttl=300)
+    cache.set("expired", AuthEntry(claims=make_claims("expired", 1, ttl=-5)))
+    cache.set("live", AuthEntry(claims=make_claims("live", 1)))
+
+    assert cache.get("expired") is None
+    assert cache.get("live").claims["jti"] == "live"
+
+
+def test_auth_cache_invalidate_user_drops_all_their_tokens():
+
+    cache = AuthCache(maxsize=10, max_ttl=300)
+    for jti, user_id in (("a", 1), ("b", 1), ("c", 2)):
+        cache.set(jti, AuthEntry(claims=make_claims(jti, user_id)))
+
+    entry = cache.get("a")
+    cache.set_user("a", entry, "slim-user")
+    assert cache.get("a").user == "slim-user"
+
+    cache.invalidate_user(1)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_cached_token_is_not_decoded_again(monkeypatch):
+    from starlette.requests import Request
+    from src.app.core import dependencies, utils
+
+    token = utils.create_access_token({"email": "a@b.c", "user_id": 1})
+    request = lambda: Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+    verify = Mock(side_effect=utils.verify_access_token)
+    monkeypatch.setattr(dependencies, "verify_access_token", verify)
+    monkeypatch.setattr(dependencies, "is_token_blacklisted", AsyncMock(return_value=False))
+    bearer = dependencies.AccessTokenBearer()
+
+    first = await bearer(request(), Mock())
+    second = await bearer(request(), Mock())
+
+    assert first == second
+    verify.assert_called_once()
+    auth_cache.invalidate(auth_cache.key_for(token))
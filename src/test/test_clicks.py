@@ -0,0 +1,173 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock
+from datetime import datetime
+from src.app.core.clicks import ClickAggregator, ClickEventWriter, rollup_counts, user_agent_family
+
+
+def make_engine(conn):
+
+    @asynccontextmanager
+    async def begin():
+        yield conn
+
+    engine = Mock()
+    engine.begin = begin
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_flush_batches_clicks_per_short_code():
+
+    conn = Mock()
+    conn.execute = AsyncMock()
+
+    aggregator = ClickAggregator(flush_interval=60, flush_threshold=100)
+    aggregator._engine = make_engine(conn)
+
+    aggregator.record("XYZ789")
+    aggregator.record("ABC123")
+    aggregator.record("ABC123")
+
+    flushed = await aggregator.flush()
+
+    assert flushed == 3
+    #rows are updated (and locked) in short_code order
+    params = conn.execute.await_args.args[1]
+    assert [(p["code"], p["delta"]) for p in params] == [("ABC123", 2), ("XYZ789", 1)]
+    assert aggregator.stats()["pending_clicks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_clicks_buffered():
+
+    conn = Mock()
+    conn.execute = AsyncMock(side_effect=RuntimeError("db down"))
+
+    aggregator = ClickAggregator(flush_interval=60, flush_threshold=100)
+    aggregator._engine = make_engine(conn)
+
+    aggregator.record("ABC123")
+
+    assert await aggregator.flush() == 0
+    assert aggregator.stats()["pending_clicks"] == 1
+    assert aggregator.failed_flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_a_flush_in_progress():
+
+    writing = asyncio.Event()
+    release = asyncio.Event()
+    written = []
+
+    async def execute(statement, params):
+        writing.set()
+        await release.wait()
+        written.extend(params)
+
+    conn = Mock()
+    conn.execute = execute
+
+    aggregator = ClickAggregator(flush_interval=60, flush_threshold=1)
+    aggregator.start(make_engine(conn))
+
+    aggregator.record("ABC123")
+    await writing.wait()
+
+    stopping = asyncio.create_task(aggregator.stop())
+    await asyncio.sleep(0)
+    release.set()
+    await stopping
+
+    assert written == [{"code": "ABC123", "delta": 1}]
+    assert aggregator.stats()["flushed_clicks"] == 1
+
+
+def test_user_agent_family():
+
+    assert user_agent_family(None) == "Unknown"
+    assert user_agent_family("Mozilla/5.0 (Windows NT 10.0) AppleWebKit/537.36 Chrome/126.0 Safari/537.36 Edg/126.0") == "Edge"
+    assert user_agent_family("Mozilla/5.0 (Macintosh) AppleWebKit/605.1.15 Version/17.5 Safari/605.1.15") == "Safari"
+    assert user_agent_family("Googlebot/2.1 (+http://www.google.com/bot.html)") == "Bot"
+    assert user_agent_family("curl/8.5.0") == "curl"
+
+
+def test_rollup_counts_buckets_each_granularity():
+
+    events = [
+        ("ABC123", datetime(2025, 7, 21, 19, 16, 5)),
+        ("ABC123", datetime(2025, 7, 21, 19, 16, 50)),
+        ("ABC123", datetime(2025, 7, 21, 19, 17, 1))
+    ]
+
+    counts = rollup_counts(events)
+
+    assert counts["ABC123", "minute", datetime(2025, 7, 21, 19, 16)] == 2
+    assert counts["ABC123", "minute", datetime(2025, 7, 21, 19, 17)] == 1
+    assert counts["ABC123", "hour", datetime(2025, 7, 21, 19)] == 3
+    assert counts["ABC123", "day", datetime(2025, 7, 21)] == 3
+
+
+@pytest.mark.asyncio
+async def test_event_writer_inserts_events_and_rollups_per_batch():
+
+    conn = Mock()
+    conn.execute = AsyncMock()
+    conn.dialect.name = "sqlite"
+
+    writer = ClickEventWriter(buffer_size=10, flush_interval=60, batch_size=2)
+    writer._engine = make_engine(conn)
+
+    for _ in range(3):
+        writer.record("ABC123", referrer="https://news.example/", user_agent="curl/8.5.0", country="ng")
+
+    assert await writer.flush() == 3
+
+    #two batches, each one insert into click_events and one rollup upsert
+    assert conn.execute.await_count == 4
+    events = conn.execute.await_args_list[0].args[1]
+    assert events[0]["user_agent_family"] == "curl"
+    assert events[0]["country"] == "NG"
+    assert writer.stats()["buffered_events"] == 0
+
+
+@pytest.mark.asyncio
+async def test_event_writer_upserts_rollups_in_key_order():
+
+    conn = Mock()
+    conn.execute = AsyncMock()
+    conn.dialect.name = "sqlite"
+
+    writer = ClickEventWriter(buffer_size=10, flush_interval=60, batch_size=10)
+    writer._engine = make_engine(conn)
+
+    for short_code in ("ZZZ999", "AAA111", "ZZZ999"):
+        writer.record(short_code)
+
+    await writer.flush()
+
+    rollups = conn.execute.await_args_list[1].args[1]
+    keys = [(row["short_code"], row["granularity"], row["bucket_start"]) for row in rollups]
+    assert keys == sorted(keys)
+    assert len(keys) == 6
+
+
+@pytest.mark.asyncio
+async def test_event_writer_ring_buffer_drops_oldest_and_keeps_failed_batches():
+
+    conn = Mock()
+    conn.execute = AsyncMock(side_effect=RuntimeError("db down"))
+    conn.dialect.name = "sqlite"
+
+    writer = ClickEventWriter(buffer_size=2, flush_interval=60, batch_size=10)
+    writer._engine = make_engine(conn)
+
+    for code in ("A", "B", "C"):
+        writer.record(code)
+
+    assert await writer.flush() == 0
+    assert [event[0] for event in writer._buffer] == ["B", "C"]
+    assert writer.stats()["dropped"] == 1
+    assert writer.failed_batches == 1
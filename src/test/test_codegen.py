@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import AsyncMock
+from src.app.core.codegen import RandomCodeGenerator, SequenceCodeGenerator, base62_encode
+
+
+def test_base62_encode_pads_to_length():
+
+    assert base62_encode(0, 4) == "0000"
+    assert base62_encode(61, 2) == "0Z"
+
+    with pytest.raises(ValueError):
+        base62_encode(62 ** 2, 2)
+
+
+def test_sequence_scramble_is_a_bijection():
+
+    generator = SequenceCodeGenerator(length=2, block_size=10, scramble=True, key=7)
+
+    codes = {generator.encode(value) for value in range(62 ** 2)}
+
+    assert len(codes) == 62 ** 2
+    assert generator.encode(0) != base62_encode(0, 2)
+
+
+@pytest.mark.asyncio
+async def test_sequence_allocates_one_block_per_block_size(monkeypatch):
+
+    generator = SequenceCodeGenerator(length=6, block_size=3, scramble=False)
+
+    async def allocate():
+        generator._next, generator._end = generator._end, generator._end + generator.block_size
+        generator.blocks_allocated += 1
+
+    monkeypatch.setattr(generator, "_allocate_block", AsyncMock(side_effect=allocate))
+
+    codes = [await generator.next_code() for _ in range(7)]
+
+    assert codes[:3] == ["000000", "000001", "000002"]
+    assert len(set(codes)) == 7
+    assert generator._allocate_block.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_random_codes_have_requested_length():
+
+    generator = RandomCodeGenerator(length=8)
+
+    assert len(await generator.next_code()) == 8
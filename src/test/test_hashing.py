@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from src.app.core.hashing import HashingPool, HashingPoolBusy
+
+
+def slow_identity(value):
+    import time
+    time.sleep(0.05)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_on_the_pool():
+
+    pool = HashingPool(kind="thread", workers=2, max_queue=10)
+
+    hashed = await pool.hash("Dyoung@20")
+
+    assert await pool.verify("Dyoung@20", hashed) is True
+    assert await pool.verify("wrong", hashed) is False
+    assert pool.stats()["completed"] == 3
+
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_work_beyond_the_queue_limit():
+
+    pool = HashingPool(kind="thread", workers=1, max_queue=1)
+
+    results = await asyncio.gather(
+        *(pool.run(slow_identity, i) for i in range(3)),
+        return_exceptions=True
+    )
+
+    assert results[:2] == [0, 1]
+    assert isinstance(results[2], HashingPoolBusy)
+    assert pool.stats()["rejected"] == 1
+
+    pool.shutdown()
@@ -0,0 +1,96 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import Mock
+from datetime import date
+from sqlalchemy.dialects import postgresql
+from src.app.core.hll import HyperLogLog
+from src.app.core.visitors import VisitorCounter, merged_sketch
+
+
+@pytest.mark.parametrize("cardinality", [10, 1000, 50000])
+def test_estimate_within_error_bounds(cardinality):
+
+    sketch = HyperLogLog(12)
+    for i in range(cardinality):
+        sketch.add(f"visitor-{i}")
+        sketch.add(f"visitor-{i}")
+
+    #four standard errors: a fixed hash function makes this deterministic anyway
+    assert abs(sketch.count() - cardinality) <= max(1, 4 * sketch.standard_error * cardinality)
+
+
+def test_merge_is_the_union():
+
+    monday, tuesday, both = HyperLogLog(12), HyperLogLog(12), HyperLogLog(12)
+
+    for i in range(3000):
+        monday.add(f"v{i}")
+        both.add(f"v{i}")
+    for i in range(2000, 5000):
+        tuesday.add(f"v{i}")
+        both.add(f"v{i}")
+
+    monday.merge(tuesday)
+
+    assert monday.to_bytes() == both.to_bytes()
+    assert len(monday.to_bytes()) == 4096
+
+
+def test_sketch_round_trips_and_rejects_wrong_size():
+
+    sketch = HyperLogLog(12)
+    sketch.add("someone")
+
+    assert HyperLogLog(12, sketch.to_bytes()).count() == 1
+
+    with pytest.raises(ValueError):
+        HyperLogLog(12, bytes(10))
+
+
+def test_visitor_counter_keeps_sparse_registers_per_code_and_day():
+
+    counter = VisitorCounter(precision=12, flush_interval=60)
+
+    for _ in range(3):
+        counter.record("ABC123", "1.2.3.4|curl/8.5.0")
+    counter.record("ABC123", "5.6.7.8|curl/8.5.0")
+
+    registers = counter._pending["ABC123", date.today()]
+    assert 1 <= len(registers) <= 2
+
+    sketch = HyperLogLog(12)
+    for index, rank in registers.items():
+        sketch.update(index, rank)
+    assert sketch.count() == 2
+
+    assert merged_sketch([sketch.to_bytes(), sketch.to_bytes()], 12).count() == 2
+
+
+@pytest.mark.asyncio
+async def test_visitor_counter_locks_rows_in_primary_key_order():
+
+    statements = []
+
+    async def execute(statement, params=None):
+        statements.append((statement, params))
+        return []
+
+    conn = Mock(execute=execute)
+    conn.dialect.name = "postgresql"
+
+    @asynccontextmanager
+    async def begin():
+        yield conn
+
+    counter = VisitorCounter(precision=12, flush_interval=60)
+    counter._engine = Mock(begin=begin)
+    for short_code in ("ZZZ999", "AAA111", "MMM555"):
+        counter.record(short_code, "1.2.3.4|curl/8.5.0")
+
+    await counter.flush()
+
+    inserted = [row["short_code"] for row in statements[0][1]]
+    assert inserted == ["AAA111", "MMM555", "ZZZ999"]
+
+    locking = str(statements[1][0].compile(dialect=postgresql.dialect()))
+    assert "ORDER BY visitor_sketches.short_code, visitor_sketches.day FOR UPDATE" in locking
@@ -0,0 +1,76 @@
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+from src.app.core.cache import ResolvedURL, redirect_cache
+from src.app.core.maintenance import MaintenanceWorker
+
+
+def make_engine(conn, lock_conn):
+
+    @asynccontextmanager
+    async def begin():
+        yield conn
+
+    @asynccontextmanager
+    async def connect():
+        yield lock_conn
+
+    engine = Mock()
+    engine.begin = begin
+    engine.connect = connect
+    return engine
+
+
+def make_worker(batch_size=2, max_batches=3):
+    return MaintenanceWorker(interval=60, batch_size=batch_size, max_batches=max_batches, jitter=0.2, lock_key=1)
+
+
+@pytest.mark.asyncio
+async def test_purge_stops_at_max_batches():
+
+    conn = Mock()
+    conn.execute = AsyncMock(return_value=Mock(rowcount=2))
+
+    worker = make_worker()
+    worker._engine = make_engine(conn, Mock())
+
+    assert await worker.purge_expired_tokens() == 6
+    assert conn.execute.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_deactivation_stops_on_a_short_batch_and_evicts_cached_links():
+
+    redirect_cache.set("OLD123", ResolvedURL("OLD123", "https://google.com/", True, datetime(2020, 1, 1)))
+
+    conn = Mock()
+    conn.execute = AsyncMock(side_effect=[
+        Mock(scalars=Mock(return_value=Mock(all=Mock(return_value=["OLD123", "OLD456"])))),
+        Mock(scalars=Mock(return_value=Mock(all=Mock(return_value=["OLD789"]))))
+    ])
+
+    worker = make_worker()
+    worker._engine = make_engine(conn, Mock())
+
+    assert await worker.deactivate_expired_urls() == 3
+    assert redirect_cache.get("OLD123") is None
+
+
+@pytest.mark.asyncio
+async def test_run_is_skipped_when_another_worker_holds_the_lock():
+
+    lock_conn = Mock()
+    lock_conn.dialect.name = "postgresql"
+    lock_conn.execute = AsyncMock(return_value=Mock(scalar=Mock(return_value=False)))
+    lock_conn.commit = AsyncMock()
+
+    conn = Mock()
+    conn.execute = AsyncMock()
+
+    worker = make_worker()
+    worker._engine = make_engine(conn, lock_conn)
+
+    assert await worker.run_once() is None
+    assert worker.stats()["skipped_runs"] == 1
+    conn.execute.assert_not_awaited()
@@ -0,0 +1,80 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from src.app.core.metrics import Registry, Counter, Histogram, CallbackMetric, MetricsMiddleware, current_request, count_queries, HTTP_REQUESTS
+
+
+def test_registry_renders_prometheus_text():
+
+    registry = Registry()
+    requests = Counter("requests_total", "Requests.", ("route",), registry=registry)
+    latency = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+    CallbackMetric("entries", "Entries.", "gauge", lambda: 7, registry=registry)
+
+    requests.inc('/say "hi"')
+    requests.inc('/say "hi"', amount=2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/say \\"hi\\""} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "entries 7" in text
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_route_template_and_status():
+
+    class FakeRoute:
+        path = "/metrics-test/{code}"
+
+    async def app(scope, receive, send):
+        #what the router does on a match
+        scope["route"] = FakeRoute()
+        assert current_request.get() is not None
+        await send({"type": "http.response.start", "status": 307, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app)
+    await middleware({"type": "http", "method": "GET"}, None, send)
+
+    assert HTTP_REQUESTS._values[("GET", "/metrics-test/{code}", 307)] == 1
+    assert current_request.get() is None
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(testclient):
+
+    response = testclient.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+def test_query_header(db_engine):
+
+    async def query_app(scope, receive, send):
+        async with db_engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+            await conn.exec_driver_sql("SELECT 1")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    with count_queries() as outer:
+        response = TestClient(MetricsMiddleware(query_app, query_header=True)).get("/")
+
+    assert response.headers["x-db-queries"] == "2"
+    assert float(response.headers["x-db-time-ms"]) >= 0
+    #the enclosing counter sees the request's statements, and the repeat
+    assert outer.queries == 2
+    assert outer.repeated() == {"SELECT 1": 2}
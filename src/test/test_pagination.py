@@ -0,0 +1,50 @@
+import pytest
+from types import SimpleNamespace
+from datetime import datetime
+from typing import List
+from pydantic import TypeAdapter
+from src.app.core.pagination import encode_cursor, decode_cursor, page_with_cursor
+from src.app.schemas import URLRead
+
+
+def test_cursor_round_trip():
+
+    created_at = datetime(2025, 7, 17, 21, 47, 42, 633973)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_decode_cursor_rejects_garbage():
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_page_with_cursor_points_at_last_row_of_page():
+
+    rows = [SimpleNamespace(created_at=datetime(2025, 1, day), id=day) for day in (3, 2, 1)]
+
+    page, next_cursor = page_with_cursor(rows, 2)
+    assert [row.id for row in page] == [3, 2]
+    assert decode_cursor(next_cursor) == (datetime(2025, 1, 2), 2)
+
+    page, next_cursor = page_with_cursor(rows, 3)
+    assert len(page) == 3
+    assert next_cursor is None
+
+
+def test_urls_me_rows_match_the_response_model(db_client):
+
+    for i in range(3):
+        db_client.post("/api/v1/urls", json={"original_url": f"https://example.com/{i}"})
+
+    response = db_client.get("/api/v1/urls/me", params={"limit": 2})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "X-Next-Cursor" in response.headers
+
+    #the directly encoded rows are exactly what the documented model would have produced
+    rows = response.json()
+    validated = TypeAdapter(List[URLRead]).validate_python(rows)
+    assert TypeAdapter(List[URLRead]).dump_python(validated, mode="json") == rows
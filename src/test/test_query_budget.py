@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlmodel import select
+from fastapi import status
+from src.app import services
+from src.app.db import main as db_main
+from src.app.core.cache import redirect_cache
+from src.app.models import URL
+
+
+@pytest.fixture
+def short_code(db_client):
+    response = db_client.post("/api/v1/urls", json={"original_url": "https://example.com/budget"})
+    redirect_cache.clear()
+    return response.json()["short_code"]
+
+
+@pytest.mark.parametrize("path", ["/{code}", "/api/v1/urls/{code}"])
+def test_redirect_budget(db_client, query_budget, short_code, path, monkeypatch):
+
+    with query_budget(1):
+        response = db_client.get(path.format(code=short_code), follow_redirects=False)
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+
+    #warm cache: no database at all, not even a (replica) session
+    monkeypatch.setattr(db_main, "read_session", Mock(side_effect=AssertionError("read session opened")))
+    with query_budget(0):
+        response = db_client.get(path.format(code=short_code), follow_redirects=False)
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+
+
+def test_unknown_code_budget(db_client, query_budget):
+
+    with query_budget(1):
+        response = db_client.get("/doesnotexist", follow_redirects=False)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    with query_budget(0):
+        db_client.get("/doesnotexist", follow_redirects=False)
+
+
+def test_create_url_budget(db_client, query_budget):
+
+    #INSERT ... ON CONFLICT DO NOTHING RETURNING, nothing else
+    with query_budget(1):
+        response = db_client.post("/api/v1/urls", json={"original_url": "https://example.com/new"})
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_create_url_custom_code_conflict(db_client, query_budget):
+
+    payload = {"original_url": "https://example.com/custom", "short_code": "mycode"}
+    assert db_client.post("/api/v1/urls", json=payload).status_code == status.HTTP_201_CREATED
+
+    with query_budget(1):
+        response = db_client.post("/api/v1/urls", json=payload)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Shortcode already exists. Please choose another or autogenerate."
+
+
+@pytest.mark.parametrize("path,budget", [
+    ("/api/v1/urls/me", 1),
+    ("/api/v1/users", 1),
+    ("/api/v1/users/1", 1),
+    ("/api/v1/urls/{code}/stats", 3)
+])
+def test_read_endpoint_budget(db_client, query_budget, short_code, path, budget):
+
+    #a few more links so a per-row query would show up
+    for i in range(3):
+        db_client.post("/api/v1/urls", json={"original_url": f"https://example.com/{i}"})
+
+    with query_budget(budget) as stats:
+        response = db_client.get(path.format(code=short_code))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert stats.repeated() == {}
+
+
+def test_create_url_generated_code_conflict_retries(db_client, query_budget, monkeypatch):
+
+    payload = {"original_url": "https://example.com/custom", "short_code": "taken1"}
+    assert db_client.post("/api/v1/urls", json=payload).status_code == status.HTTP_201_CREATED
+
+    monkeypatch.setattr(services, "generate_short_code", AsyncMock(side_effect=["taken1", "fresh1"]))
+
+    with query_budget(2):
+        response = db_client.post("/api/v1/urls", json={"original_url": "https://example.com/generated"})
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["short_code"] == "fresh1"
+
+
+def test_delete_user_budget(db_client, db_engine, query_budget):
+
+    for i in range(3):
+        db_client.post("/api/v1/urls", json={"original_url": f"https://example.com/{i}"})
+
+    #existence check, then one UPDATE for all the links and the DELETE
+    with query_budget(3):
+        response = db_client.delete("/api/v1/users/1")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    async def owners():
+        async with db_engine.connect() as conn:
+            return (await conn.execute(select(URL.user_id))).scalars().all()
+
+    assert asyncio.run(owners()) == [None, None, None]
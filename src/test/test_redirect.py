@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi import status
+from datetime import datetime, timedelta
+from src.app.api import redirect as redirect_module
+from src.app.core.cache import ResolvedURL
+
+
+def mock_services(monkeypatch, resolved):
+
+    mock_service = Mock()
+    mock_service.resolve_short_code = AsyncMock(return_value=resolved)
+    mock_service.redirect_url = AsyncMock(return_value=None)
+
+    monkeypatch.setattr(redirect_module, "url_services", mock_service)
+    return mock_service
+
+
+@pytest.mark.asyncio
+async def test_top_level_redirect(testclient, monkeypatch):
+
+    resolved = ResolvedURL("ABC123", "https://google.com/", True, datetime.now() + timedelta(days=1))
+    mock_service = mock_services(monkeypatch, resolved)
+
+    for _ in range(2):
+        response = testclient.get("/ABC123", headers={"user-agent": "curl/8.5.0"}, follow_redirects=False)
+
+        assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+        assert response.headers["location"] == "https://google.com/"
+
+    #the prebuilt response is reused, not rebuilt (or mutated) per request
+    assert response.headers.get_list("location") == ["https://google.com/"]
+
+    mock_service.resolve_short_code.assert_awaited_with("ABC123")
+    assert mock_service.redirect_url.await_args.kwargs["user_agent"] == "curl/8.5.0"
+
+
+@pytest.mark.asyncio
+async def test_head_requests_redirect_without_recording_a_click(testclient, monkeypatch):
+
+    resolved = ResolvedURL("ABC123", "https://google.com/", True, None)
+    mock_service = mock_services(monkeypatch, resolved)
+
+    response = testclient.head("/ABC123", follow_redirects=False)
+
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+    assert response.headers["location"] == "https://google.com/"
+    mock_service.redirect_url.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_top_level_redirect_unknown_and_expired(testclient, monkeypatch):
+
+    mock_service = mock_services(monkeypatch, None)
+
+    response = testclient.get("/NOPE00", follow_redirects=False)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Shortcode does not exist or no longer active."
+
+    mock_service.resolve_short_code.return_value = ResolvedURL("OLD123", "https://google.com/", True, datetime.now() - timedelta(days=1))
+
+    response = testclient.get("/OLD123", follow_redirects=False)
+    assert response.status_code == status.HTTP_410_GONE
+
+    mock_service.redirect_url.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/ab", "/wp-login.php-backup"])
+async def test_paths_no_short_code_can_match_skip_the_lookup(testclient, monkeypatch, path):
+
+    mock_service = mock_services(monkeypatch, None)
+
+    response = testclient.get(path, follow_redirects=False)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    mock_service.resolve_short_code.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_api_routes_still_win_over_the_redirect(testclient):
+
+    response = testclient.get("/")
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("short_code", ["metrics", "Health", "docs"])
+async def test_top_level_paths_are_reserved(testclient, short_code):
+
+    response = testclient.post("/api/v1/urls", json={"original_url": "https://google.com/", "short_code": short_code})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+from src.app.models import BlacklistedToken
+from src.app.core.revocation import BloomFilter, RevocationFilter
+from src.app.core import utils
+
+
+def test_bloom_filter_has_no_false_negatives():
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"jti-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_filter_is_conservative_until_loaded():
+
+    revocations = RevocationFilter(capacity=100, error_rate=0.01, refresh_interval=60)
+
+    assert revocations.might_be_revoked("any-jti") is True
+
+    revocations.loaded = True
+    revocations.add("revoked-jti")
+
+    assert revocations.might_be_revoked("revoked-jti") is True
+    assert revocations.might_be_revoked("fresh-jti") is False
+
+
+def test_refresh_retries_a_failed_startup_load(db_engine):
+
+    revocations = RevocationFilter(capacity=100, error_rate=0.01, refresh_interval=60)
+    revocations._engine = Mock(connect=Mock(side_effect=ConnectionError("database is starting")))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(revocations.load())
+    assert revocations.loaded is False
+
+    revocations._engine = db_engine
+    asyncio.run(revocations.refresh())
+
+    assert revocations.loaded is True
+    assert revocations.might_be_revoked("fresh-jti") is False
+
+
+def test_refresh_picks_up_revocations_that_committed_late(db_engine):
+
+    now = datetime.now()
+    expires_at = now + timedelta(hours=1)
+
+    async def revoke(row_id: int, jti: str, revoked_at: datetime):
+        async with db_engine.begin() as conn:
+            await conn.execute(BlacklistedToken.__table__.insert().values(
+                id=row_id, jti=jti, expires_at=expires_at, revoked_at=revoked_at
+            ))
+
+    revocations = RevocationFilter(capacity=100, error_rate=0.01, refresh_interval=60, overlap=30)
+    revocations._engine = db_engine
+
+    asyncio.run(revoke(2, "read-first", now))
+    asyncio.run(revocations.load())
+
+    #lower id and earlier timestamp, but committed after the row above was read
+    asyncio.run(revoke(1, "committed-late", now - timedelta(seconds=5)))
+    asyncio.run(revocations.refresh())
+
+    assert revocations.might_be_revoked("committed-late") is True
+    assert revocations.bloom.count == 2
+
+
+@pytest.mark.asyncio
+async def test_is_token_blacklisted_skips_db_for_definite_negatives(monkeypatch, fake_session):
+
+    revocations = RevocationFilter(capacity=100, error_rate=0.01, refresh_interval=60)
+    revocations.loaded = True
+    monkeypatch.setattr(utils, "revocation_filter", revocations)
+
+    session = Mock()
+    session.execute = AsyncMock()
+
+    assert await utils.is_token_blacklisted("fresh-jti", session) is False
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cached_token_is_rejected_once_revoked_elsewhere(monkeypatch):
+    from fastapi import HTTPException
+    from starlette.requests import Request
+    from src.app.core import dependencies
+    from src.app.core.cache import auth_cache
+
+    revocations = RevocationFilter(capacity=100, error_rate=0.01, refresh_interval=60)
+    revocations.loaded = True
+    monkeypatch.setattr(utils, "revocation_filter", revocations)
+
+    token = utils.create_access_token({"email": "a@b.c", "user_id": 1})
+    jti = utils.verify_access_token(token)["jti"]
+    request = lambda: Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+    session = Mock()
+    session.execute = AsyncMock(return_value=Mock(scalar_one_or_none=Mock(return_value=1)))
+    bearer = dependencies.AccessTokenBearer()
+
+    assert (await bearer(request(), session))["jti"] == jti
+    assert auth_cache.get(auth_cache.key_for(token)) is not None
+
+    #learnt from a refresh or another worker's broadcast, this worker's cache untouched
+    revocations.add(jti)
+
+    with pytest.raises(HTTPException) as error:
+        await bearer(request(), session)
+
+    assert error.value.detail == "Token has been revoked"
+    auth_cache.invalidate(auth_cache.key_for(token))
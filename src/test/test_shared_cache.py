@@ -0,0 +1,227 @@
+import asyncio
+import pytest
+from datetime import datetime
+from src.app.core.cache import TTLCache, ResolvedURL, NOT_FOUND, encode_resolved, decode_resolved, redirect_ttl
+from src.app.core.shared_cache import MemoryStore, InvalidationBus, TwoTierCache
+
+
+def make_worker(store):
+    """
+    One worker's view of the shared store: its own L1 and invalidation bus.
+    """
+
+    bus = InvalidationBus(store, prefix="test")
+    cache = TwoTierCache(
+        name="redirect",
+        local=TTLCache(maxsize=100, ttl=60),
+        store=store,
+        bus=bus,
+        encode=encode_resolved,
+        decode=decode_resolved,
+        ttl_of=redirect_ttl
+    )
+    return bus, cache
+
+
+def test_resolved_url_round_trips_through_the_codec():
+
+    resolved = ResolvedURL("abc123", "https://google.com/", True, datetime(2030, 1, 1, 12, 30))
+
+    assert decode_resolved(encode_resolved(resolved)) == resolved
+    assert decode_resolved(encode_resolved(resolved._replace(expires_at=None))).expires_at is None
+    assert decode_resolved(encode_resolved(NOT_FOUND)) is NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_second_worker_is_served_from_the_shared_tier():
+
+    store = MemoryStore()
+    _, first = make_worker(store)
+    _, second = make_worker(store)
+
+    resolved = ResolvedURL("abc123", "https://google.com/", True, None)
+    await first.set("abc123", resolved)
+
+    assert await second.get("abc123") == resolved
+    assert second.shared_hits == 1
+    #now in the second worker's L1 too
+    assert second.local.get("abc123") == resolved
+
+
+@pytest.mark.asyncio
+async def test_invalidation_fans_out_to_other_workers():
+
+    store = MemoryStore()
+    first_bus, first = make_worker(store)
+    second_bus, second = make_worker(store)
+    first_bus.start()
+    second_bus.start()
+    await asyncio.sleep(0)
+
+    try:
+        resolved = ResolvedURL("abc123", "https://google.com/", True, None)
+        await first.set("abc123", resolved)
+        assert await second.get("abc123") == resolved
+
+        await first.invalidate("abc123")
+        await asyncio.sleep(0)
+
+        assert second.local.get("abc123") is None
+        assert await second.get("abc123") is None
+        assert second_bus.received == 1
+        #a worker skips its own messages
+        assert first_bus.received == 0
+    finally:
+        await first_bus.stop()
+        await second_bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_replacing_a_negative_entry_reaches_other_workers():
+
+    store = MemoryStore()
+    first_bus, first = make_worker(store)
+    second_bus, second = make_worker(store)
+    first_bus.start()
+    second_bus.start()
+    await asyncio.sleep(0)
+
+    try:
+        #probed on the second worker before the code existed
+        await second.set("mycode", NOT_FOUND)
+
+        resolved = ResolvedURL("mycode", "https://google.com/", True, None)
+        await first.replace_many([("mycode", resolved)])
+        await asyncio.sleep(0)
+
+        assert await second.get("mycode") == resolved
+    finally:
+        await first_bus.stop()
+        await second_bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_without_a_store_only_the_local_tier_is_used():
+
+    _, cache = make_worker(None)
+
+    await cache.set("abc123", NOT_FOUND)
+    assert await cache.get("abc123") is NOT_FOUND
+
+    await cache.invalidate("abc123")
+    assert await cache.get("abc123") is None
+    assert cache.stats()["backend"] is None
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_failures_fall_back_to_local():
+
+    class BrokenStore(MemoryStore):
+        async def get(self, key):
+            raise ConnectionError("store is down")
+
+    _, cache = make_worker(BrokenStore())
+
+    assert await cache.get("abc123") is None
+    assert cache.shared_errors == 1
+
+
+def counting_loader(value, delay=0.01):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+
+    return loader, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+
+    _, cache = make_worker(None)
+    resolved = ResolvedURL("hot123", "https://google.com/", True, None)
+    loader, calls = counting_loader(resolved)
+
+    results = await asyncio.gather(*(cache.get_or_load("hot123", loader) for _ in range(50)))
+
+    assert all(result == resolved for result in results)
+    assert len(calls) == 1
+    assert cache.coalesced == 49
+    #the next call is a plain cache hit
+    assert await cache.get_or_load("hot123", loader) == resolved
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_caller_does_not_cancel_the_shared_load():
+
+    _, cache = make_worker(None)
+    resolved = ResolvedURL("hot123", "https://google.com/", True, None)
+    loader, calls = counting_loader(resolved, delay=0.05)
+
+    first = asyncio.ensure_future(cache.get_or_load("hot123", loader))
+    second = asyncio.ensure_future(cache.get_or_load("hot123", loader))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == resolved
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_loads_with_the_shared_lock():
+
+    store = MemoryStore()
+    _, first = make_worker(store)
+    _, second = make_worker(store)
+    for cache in (first, second):
+        cache.lock_ttl = 1.0
+        cache.lock_poll = 0.005
+
+    resolved = ResolvedURL("hot123", "https://google.com/", True, None)
+    loader, calls = counting_loader(resolved, delay=0.05)
+
+    results = await asyncio.gather(first.get_or_load("hot123", loader), second.get_or_load("hot123", loader))
+
+    assert results == [resolved, resolved]
+    assert len(calls) == 1
+    assert first.lock_waits + second.lock_waits == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_near_expiry_are_served_stale_and_refreshed():
+
+    _, cache = make_worker(None)
+    cache.refresh_ahead = 10.0
+
+    old = ResolvedURL("hot123", "https://old.example/", True, None)
+    new = ResolvedURL("hot123", "https://new.example/", True, None)
+    cache.local.set("hot123", old, ttl=5.0)
+    loader, calls = counting_loader(new)
+
+    assert await cache.get_or_load("hot123", loader) == old
+    #a second hit while the refresh runs doesn't start another one
+    assert await cache.get_or_load("hot123", loader) == old
+    await asyncio.sleep(0.05)
+
+    assert len(calls) == 1
+    assert cache.refreshes == 1
+    assert await cache.get_or_load("hot123", loader) == new
+
+
+@pytest.mark.asyncio
+async def test_short_lived_entries_are_not_refreshed():
+
+    _, cache = make_worker(None)
+    #longer than the negative TTL
+    cache.refresh_ahead = 60.0
+    loader, calls = counting_loader(NOT_FOUND)
+
+    await cache.set("typo", NOT_FOUND)
+    assert await cache.get_or_load("typo", loader) is NOT_FOUND
+    await asyncio.sleep(0.02)
+
+    assert calls == []
+    assert cache.refreshes == 0
@@ -1,5 +1,7 @@
+import json
 import pytest
 from unittest.mock import AsyncMock, Mock
+from contextlib import asynccontextmanager
 from fastapi import status
 from src.app.api import shortner as url_module
 from datetime import datetime, timedelta, timezone
@@ -44,7 +46,6 @@ urls = [
 async def test_create_short_url_success(fake_session, testclient, monkeypatch):
 
     mock_service = Mock()
-    mock_service.existing_short_code = AsyncMock(return_value=None)
     mock_service.create_short_url = AsyncMock(return_value=url_data)
 
     monkeypatch.setattr(url_module, "url_services", mock_service)
@@ -57,7 +58,6 @@ async def test_create_short_url_success(fake_session, testclient, monkeypatch):
     assert data["original_url"] == "https://google.com/"
     assert data["short_code"] == url_short_code
 
-    mock_service.existing_short_code.assert_awaited()
     mock_service.create_short_url.assert_awaited()
 
 
@@ -65,8 +65,7 @@ async def test_create_short_url_success(fake_session, testclient, monkeypatch):
 async def test_create_short_url_already_exists(fake_session, testclient, monkeypatch):
 
     mock_service = Mock()
-    mock_service.existing_short_code = AsyncMock(return_value=url_data)
-    mock_service.create_short_url = AsyncMock(return_value=url_data)
+    mock_service.create_short_url = AsyncMock(return_value=None)
 
     monkeypatch.setattr(url_module, "url_services", mock_service)
 
@@ -77,7 +76,7 @@ async def test_create_short_url_already_exists(fake_session, testclient, monkeyp
     data = response.json()
     assert data["detail"] == "Shortcode already exists. Please choose another or autogenerate."
 
-    mock_service.existing_short_code.assert_awaited()
+    mock_service.create_short_url.assert_awaited()
 
 
 @pytest.mark.asyncio
@@ -86,18 +85,27 @@ async def test_get_urls(fake_session, testclient, monkeypatch):
     fake_user = 1
 
     mock_service = Mock()
-    mock_service.get_urls = AsyncMock(return_value=urls)
+    mock_service.get_urls = AsyncMock(return_value=(urls, None))
 
     monkeypatch.setattr(url_module, "url_services", mock_service)
 
-    response = testclient.get(f"{BASE_URL}")
+    response = testclient.get(f"{BASE_URL}/me", params={"active": True, "prefix": "ab"})
 
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data[0]["original_url"] == "https://google.com/"
     assert data[0]["short_code"] == url_short_code
+    assert "X-Next-Cursor" not in response.headers
 
-    mock_service.get_urls.assert_awaited_once_with(fake_user, fake_session)
+    mock_service.get_urls.assert_awaited_once_with(
+        fake_user,
+        fake_session,
+        cursor=None,
+        limit=50,
+        active=True,
+        expired=None,
+        prefix="ab"
+    )
 
 
 @pytest.mark.asyncio
@@ -110,7 +118,7 @@ async def test_redirect_to_original_url_success(fake_session, testclient, monkey
     mock_url.click_count = 0
 
     mock_service = Mock()
-    mock_service.existing_short_code = AsyncMock(return_value=mock_url)
+    mock_service.resolve_short_code = AsyncMock(return_value=mock_url)
     mock_service.redirect_url = AsyncMock(return_value=None)
 
     monkeypatch.setattr(url_module, "url_services", mock_service)
@@ -119,5 +127,201 @@ async def test_redirect_to_original_url_success(fake_session, testclient, monkey
 
     assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
 
-    mock_service.existing_short_code.assert_awaited()
-    mock_service.redirect_url.assert_awaited()
\ No newline at end of file
+    mock_service.resolve_short_code.assert_awaited()
+    mock_service.redirect_url.assert_awaited()
+
+@pytest.mark.asyncio
+async def test_create_short_urls_bulk_reports_each_item(fake_session, testclient, monkeypatch):
+
+    mock_service = Mock()
+    mock_service.create_short_urls_bulk = AsyncMock(return_value=[("created", url_data), ("conflict", None)])
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+
+    payload = [
+        {"original_url": "https://google.com/", "short_code": url_short_code},
+        {"original_url": "https://google.com/", "short_code": "TAKEN1"},
+        {"original_url": "not a url"}
+    ]
+
+    response = testclient.post(f"{BASE_URL}/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["created"] == 1
+    assert data["failed"] == 2
+    assert [r["status"] for r in data["results"]] == ["created", "conflict", "invalid"]
+    assert data["results"][0]["url"]["short_code"] == url_short_code
+
+    mock_service.create_short_urls_bulk.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_short_urls_bulk_ndjson(fake_session, testclient, monkeypatch):
+
+    mock_service = Mock()
+    mock_service.create_short_urls_bulk = AsyncMock(return_value=[("created", url_data)])
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+
+    body = '{"original_url": "https://google.com/"}\n{broken\n'
+
+    response = testclient.post(
+        f"{BASE_URL}/bulk",
+        content=body,
+        headers={"content-type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["created", "invalid"]
+
+
+@pytest.mark.asyncio
+async def test_create_short_urls_bulk_rejects_oversized_arrays_before_inserting(fake_session, testclient, monkeypatch):
+
+    mock_service = Mock()
+    mock_service.create_short_urls_bulk = AsyncMock(return_value=[("created", url_data)] * 2)
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+    monkeypatch.setattr(url_module.Config, "BULK_MAX_ITEMS", 3)
+    monkeypatch.setattr(url_module.Config, "BULK_INSERT_CHUNK", 2)
+
+    payload = [{"original_url": "https://google.com/"}] * 5
+
+    response = testclient.post(f"{BASE_URL}/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    mock_service.create_short_urls_bulk.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_short_urls_bulk_ndjson_over_the_limit_reports_what_was_saved(fake_session, testclient, monkeypatch):
+
+    mock_service = Mock()
+    mock_service.create_short_urls_bulk = AsyncMock(side_effect=lambda items, *args: [("created", url_data)] * len(items))
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+    monkeypatch.setattr(url_module.Config, "BULK_MAX_ITEMS", 3)
+    monkeypatch.setattr(url_module.Config, "BULK_INSERT_CHUNK", 2)
+
+    body = '{"original_url": "https://google.com/"}\n' * 5
+
+    response = testclient.post(
+        f"{BASE_URL}/bulk",
+        content=body,
+        headers={"content-type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["truncated"] is True
+    assert data["created"] == 3
+    assert [r["status"] for r in data["results"]] == ["created", "created", "created", "skipped"]
+
+
+@pytest.mark.asyncio
+async def test_create_short_urls_bulk_reports_values_too_long_for_the_columns(fake_session, testclient, monkeypatch):
+
+    mock_service = Mock()
+    mock_service.create_short_urls_bulk = AsyncMock()
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+
+    payload = [
+        {"original_url": "https://google.com/", "short_code": "x" * 11},
+        {"original_url": "https://google.com/" + "a" * 250}
+    ]
+
+    response = testclient.post(f"{BASE_URL}/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [r["status"] for r in response.json()["results"]] == ["invalid", "invalid"]
+    mock_service.create_short_urls_bulk.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+async def test_export_urls_streams_batches(fake_session, testclient, monkeypatch, export_format):
+
+    created_at = datetime(2025, 7, 21, 19, 16, 29)
+    batches = [
+        [{"id": 1, "short_code": "a1", "original_url": "https://a.com/", "created_at": created_at, "expires_at": None, "click_count": 0, "is_active": True}],
+        [{"id": 2, "short_code": "b2", "original_url": "https://b.com/", "created_at": created_at, "expires_at": None, "click_count": 3, "is_active": False}]
+    ]
+
+    async def stream_urls(user_id, session):
+        for batch in batches:
+            yield batch
+
+    @asynccontextmanager
+    async def read_session():
+        yield fake_session
+
+    mock_service = Mock()
+    mock_service.stream_urls = Mock(side_effect=stream_urls)
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+    monkeypatch.setattr(url_module, "read_session", read_session)
+
+    response = testclient.get(f"{BASE_URL}/me/export", params={"format": export_format})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-disposition"] == f'attachment; filename="urls.{export_format}"'
+
+    lines = response.text.splitlines()
+    if export_format == "ndjson":
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [line["short_code"] for line in map(json.loads, lines)] == ["a1", "b2"]
+        assert json.loads(lines[0])["created_at"] == "2025-07-21T19:16:29"
+    else:
+        assert response.headers["content-type"].startswith("text/csv")
+        assert lines[0] == ",".join(url_module.EXPORT_FIELDS)
+        assert lines[2].startswith("2,b2,https://b.com/")
+
+    mock_service.stream_urls.assert_called_once_with(1, fake_session)
+
+
+@pytest.mark.asyncio
+async def test_get_click_stats(fake_session, testclient, monkeypatch):
+
+    stats = {
+        "short_code": url_short_code,
+        "total_clicks": 3,
+        "granularity": "day",
+        "since": datetime(2025, 7, 1),
+        "until": datetime(2025, 7, 31),
+        "unique_visitors": 2,
+        "buckets": [{"bucket_start": datetime(2025, 7, 21), "clicks": 3, "unique_visitors": 2}]
+    }
+
+    mock_service = Mock()
+    mock_service.get_click_stats = AsyncMock(return_value=stats)
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+
+    response = testclient.get(
+        f"{BASE_URL}/{url_short_code}/stats",
+        params={"granularity": "day", "since": "2025-07-01T00:00:00", "until": "2025-07-31T00:00:00"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["unique_visitors"] == 2
+    assert response.json()["buckets"] == [{"bucket_start": "2025-07-21T00:00:00", "clicks": 3, "unique_visitors": 2}]
+
+    mock_service.get_click_stats.assert_awaited_once_with(
+        url_short_code, 1, "day", datetime(2025, 7, 1), datetime(2025, 7, 31), fake_session
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_click_stats_not_owner(fake_session, testclient, monkeypatch):
+
+    mock_service = Mock()
+    mock_service.get_click_stats = AsyncMock(return_value=None)
+
+    monkeypatch.setattr(url_module, "url_services", mock_service)
+
+    response = testclient.get(f"{BASE_URL}/{url_short_code}/stats")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
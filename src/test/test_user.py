@@ -36,11 +36,11 @@ user_data = {
 }
 
 @pytest.mark.asyncio
-async def test_get_users(fake_session, testclient, monkeypatch, skip: int=0, limit:int=10,):
+async def test_get_users(fake_session, testclient, monkeypatch, limit:int=10,):
 
     mock_service = Mock()
 
-    mock_service.get_users = AsyncMock(return_value=users)
+    mock_service.get_users = AsyncMock(return_value=(users, "next-page"))
 
     monkeypatch.setattr(user_module, "user_services", mock_service)
 
@@ -49,9 +49,25 @@ async def test_get_users(fake_session, testclient, monkeypatch, skip: int=0, lim
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data[0]['first_name'] == "test1"
+    assert response.headers["X-Next-Cursor"] == "next-page"
 
     mock_service.get_users.assert_awaited()
-    mock_service.get_users.assert_awaited_once_with(skip, limit, fake_session)
+    mock_service.get_users.assert_awaited_once_with(None, limit, fake_session)
+
+@pytest.mark.asyncio
+async def test_get_users_invalid_cursor(fake_session, testclient, monkeypatch):
+
+    mock_service = Mock()
+    mock_service.get_users = AsyncMock()
+
+    monkeypatch.setattr(user_module, "user_services", mock_service)
+
+    response = testclient.get(f"{BASE_URL}/users", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid cursor"
+
+    mock_service.get_users.assert_not_awaited()
 
 @pytest.mark.asyncio
 async def test_get_single_user_success(fake_session, testclient, monkeypatch):
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from fastapi import status
+from src.app.models import URL, ClickRollup
+from src.app.core.cache import redirect_cache
+from src.app.core.warmup import CacheWarmer
+from src.app.api import monitoring as monitoring_module
+from src.test.conftest import FAKE_USER_ID
+
+
+async def seed(engine):
+    now = datetime.now()
+    links = [
+        ("hot", 500, True, now + timedelta(days=1)),
+        ("warm", 100, True, None),
+        ("cold", 1, True, None),
+        ("off", 900, False, None),
+        ("gone", 800, True, now - timedelta(days=1))
+    ]
+
+    async with engine.begin() as conn:
+        await conn.execute(URL.__table__.insert(), [
+            {
+                "original_url": f"https://example.com/{code}",
+                "short_code": code,
+                "user_id": FAKE_USER_ID,
+                "created_at": now,
+                "expires_at": expires_at,
+                "click_count": clicks,
+                "is_active": is_active
+            }
+            for code, clicks, is_active, expires_at in links
+        ])
+        await conn.execute(ClickRollup.__table__.insert(), [
+            {"short_code": "cold", "granularity": "day", "bucket_start": now - timedelta(days=1), "clicks": 50},
+            {"short_code": "warm", "granularity": "day", "bucket_start": now - timedelta(days=2), "clicks": 10},
+            {"short_code": "hot", "granularity": "day", "bucket_start": now - timedelta(days=30), "clicks": 999}
+        ])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source,expected", [
+    ("click_count", ["hot", "warm"]),
+    ("recent", ["cold", "warm"])
+])
+async def test_warmup_caches_top_live_links(db_engine, source, expected):
+
+    await seed(db_engine)
+    warmer = CacheWarmer(limit=2, time_budget=5, source=source, recent_days=7)
+
+    await warmer.run(db_engine)
+
+    assert warmer.state == "done"
+    assert warmer.loaded == 2
+    assert sorted(code for code, _ in redirect_cache.items()) == sorted(expected)
+    assert redirect_cache.get(expected[0]).original_url == f"https://example.com/{expected[0]}"
+
+
+@pytest.mark.asyncio
+async def test_warmup_gives_up_after_its_time_budget(monkeypatch):
+
+    async def slow_load(self, engine):
+        self.loaded = 3
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(CacheWarmer, "_load", slow_load)
+    warmer = CacheWarmer(limit=10, time_budget=0.01, source="click_count", recent_days=7)
+
+    await warmer.run(None)
+
+    assert warmer.state == "timed_out"
+    assert warmer.ready
+    assert warmer.stats()["progress"] == 0.3
+
+
+def test_readiness_waits_for_warmup(testclient, monkeypatch):
+
+    warmer = CacheWarmer(limit=10, time_budget=5, source="click_count", recent_days=7)
+    monkeypatch.setattr(monitoring_module, "cache_warmer", warmer)
+
+    response = testclient.get("/api/v1/monitoring/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["warmup"]["state"] == "pending"
+
+    warmer.state = "done"
+    response = testclient.get("/api/v1/monitoring/ready")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["ready"] is True